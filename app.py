@@ -7,13 +7,15 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, SessionNotCreatedException
 from webdriver_manager.chrome import ChromeDriverManager
 import pandas as pd
 import time
 import random
 import os
 import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
 import urllib.parse
 import tkinter as tk
 from tkinter import filedialog, scrolledtext, messagebox
@@ -21,8 +23,19 @@ import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
-from email import encoders
+from email.generator import BytesGenerator
+import base64
+import hashlib
+import math
+import io
+import json
+import sqlite3
+import tempfile
+import numpy as np
+from array import array
+from functools import lru_cache
 import re
+import fnmatch
 
 # SMS via Android phone
 try:
@@ -35,6 +48,10 @@ except ImportError:
 
 PROFILE_DIR = os.path.join(os.getenv("APPDATA"), "AutoMessenger", "chrome_profile")
 os.makedirs(PROFILE_DIR, exist_ok=True)
+ROW_INDEX_DIR = os.path.join(os.getenv("APPDATA"), "AutoMessenger", "row_index")
+SUPPRESSION_DB = os.path.join(os.getenv("APPDATA"), "AutoMessenger", "suppression.db")
+JOURNAL_DIR = os.path.join(os.getenv("APPDATA"), "AutoMessenger", "journals")
+DRIVER_CACHE_FILE = os.path.join(os.getenv("APPDATA"), "AutoMessenger", "chromedriver.json")
 
 HEADLESS = False
 MIN_DELAY = 3
@@ -42,9 +59,56 @@ MAX_DELAY = 7
 WAIT_TIMEOUT = 15
 FAST_WAIT = 4
 POST_CLICK_WAIT = 0.8
+WAIT_POLL_INTERVAL = 0.1  # Seconds between condition checks in WebDriverWait
+WA_CHAT_READY_TIMEOUT = 20  # WhatsApp: chat composer usable after navigation
+WA_PREVIEW_TIMEOUT = 15  # WhatsApp: attachment preview rendered after choosing the file
+WA_UPLOAD_TIMEOUT = 30  # WhatsApp: media processed and sendable (doubled for videos)
+WA_TICK_TIMEOUT = 20  # WhatsApp: sent tick shown on the new outgoing message
+LOGIN_TIMEOUT = 180  # Seconds to wait for the WhatsApp QR scan / Messenger login before giving up
+SPA_NAVIGATION = True  # Open the next chat inside the loaded WhatsApp/Messenger app instead of reloading it
+SPA_NAV_TIMEOUT = 3  # Seconds for an in-app chat switch to settle before falling back to a full page load
+BLOCK_HEAVY_RESOURCES = True  # Block avatars/thumbnails/fonts in the browser via DevTools (Network.setBlockedURLs)
+BLOCKED_URL_PATTERNS = [
+    "*://pps.whatsapp.net/*",     # WhatsApp profile pictures
+    "*://scontent*.fbcdn.net/*",  # Messenger avatars, photos and sticker images
+    "*://video*.fbcdn.net/*",     # Messenger video previews
+]
+# Hosts (wildcards allowed) the page must always reach to load, upload and send. A blocked pattern whose
+# host part could match one of these is dropped, so host-less patterns like "*.woff2" are never applied.
+NEVER_BLOCK_HOSTS = [
+    "web.whatsapp.com",
+    "static.whatsapp.net",
+    "mmg.whatsapp.net",
+    "*.cdn.whatsapp.net",
+    "www.messenger.com",
+    "static.xx.fbcdn.net",
+    "upload.facebook.com",
+    "rupload.facebook.com",
+    "upload.messenger.com",
+]
+SMTP_TIMEOUT = 10
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100  # Reconnect after this many emails on one session
+EMAIL_MAX_IN_FLIGHT = 4       # Default parallel emails (1 = sequential with 2s gap)
+EMAIL_RATE_PER_SECOND = 1.0   # Default max emails/sec per sender account
+SMTP_STREAM_CHUNK_SIZE = 64 * 1024  # Bytes written per socket send in the DATA phase
+CSV_CHUNK_SIZE = 50000  # Rows parsed per chunk when reading contacts
+CSV_STREAM_THRESHOLD_BYTES = 20 * 1024 * 1024  # Stream (don't preload) contact CSVs larger than this
+ROW_INDEX_STRIDE = 1000  # Byte offset recorded for every Nth CSV row in the row index
+COMPARE_BUCKETS = 64  # On-disk hash partitions for the low-memory CSV compare
+COMPARE_CHUNK_SIZE = 200000  # Rows per chunk in the low-memory CSV compare
+JOURNAL_FSYNC_EVERY = 20  # fsync the send journal after this many records...
+JOURNAL_FSYNC_INTERVAL = 2.0  # ...or when this many seconds passed since the last fsync
+PHONE_CACHE_SIZE = 65536  # Per-number normalization results kept in the LRU cache
+NATIONAL_NUMBER_MAX_DIGITS = 10  # Numbers this short (without a + or 00 prefix) get the default country code
+DEDUP_USE_BLOOM_FILTER = False  # True: memory-bounded dedup for huge lists (rare false positives drop a unique contact)
+DEDUP_BLOOM_CAPACITY = 10_000_000  # Recipients the Bloom filter is sized for
+DEDUP_BLOOM_ERROR_RATE = 0.001  # Target false-positive rate at that capacity (~18 MB of bits for 10M)
 # ===============================================
 
-# --- Helper: Extract numeric digits from phone numbers ---
+# --- Phone normalization: digits, default country code, skip-01 rule ---
+_NON_DIGIT_RE = re.compile(r'\D')
+SKIP_PHONE_PREFIX = "01"  # "Skip phone numbers starting with 01" (checked on the number as typed)
+
 def extract_phone_digits(phone_str):
     """
     Extract only numeric digits from a phone number string.
@@ -53,9 +117,1164 @@ def extract_phone_digits(phone_str):
         "Phone: 9779803661701" -> "9779803661701"
         "977 (980) 366-1701" -> "9779803661701"
     """
-    import re
-    digits = re.sub(r'\D', '', str(phone_str))
-    return digits.strip()
+    return _NON_DIGIT_RE.sub('', str(phone_str))
+
+def clean_country_code(code):
+    """Digits of a country code typed as "977", "+977" or "00977" ("" if none)."""
+    return extract_phone_digits(code).lstrip("0")
+
+def _normalize_phone(text, country_code):
+    """Uncached core of normalize_phone(); text must be a str."""
+    text = text.strip()
+    digits = text if text.isdigit() else _NON_DIGIT_RE.sub('', text)
+    if digits[:2] == "00":
+        return digits[2:]
+    if not country_code or not digits or text[:1] == "+":
+        return digits
+    if digits[0] == "0":
+        return country_code + digits.lstrip("0")
+    if digits.startswith(country_code) and len(digits) > NATIONAL_NUMBER_MAX_DIGITS:
+        return digits  # Already has the code in front
+    return country_code + digits
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
+def normalize_phone(phone_str, country_code=""):
+    """
+    Normalize one phone number to international digits (no '+').
+
+    Cached (PHONE_CACHE_SIZE entries) for the per-contact path: SMS
+    addresses and suppression/dedup keys, where the same numbers recur.
+
+    "00" international prefixes are dropped. With a default country code,
+    national numbers get it prepended: a leading trunk 0 is replaced by
+    it ("09801234567" → "9779801234567") and other numbers without a + or
+    00 prefix are prefixed, unless they start with the code and are longer
+    than NATIONAL_NUMBER_MAX_DIGITS (already international). So with code 86
+    the 11-digit mobile "13812345678" becomes "8613812345678", and with 91
+    "9123456789" becomes "919123456789". Without a country code only the
+    digits are kept.
+    """
+    return _normalize_phone(str(phone_str), country_code)
+
+def sms_address(phone_str, country_code=""):
+    """
+    Number to put in an sms: intent. International numbers (typed with + or
+    00, or any number once a default country code is set) get "+" and the
+    international digits, since Android dials a bare number as national.
+    Anything else keeps its digits as typed.
+    """
+    text = str(phone_str).strip()
+    digits = extract_phone_digits(text)
+    if not digits:
+        return ""
+    if text[:1] == "+" or digits[:2] == "00" or country_code:
+        return "+" + normalize_phone(text, country_code)
+    return digits
+
+def normalize_phone_series(series, country_code=""):
+    """
+    normalize_phone() for a whole text column.
+
+    A single tight pass over the values: pandas' own .str methods loop in
+    Python per operation for object/str columns, so chaining strip,
+    replace, startswith and len costs several passes; the cache would only
+    add overhead on mostly-unique columns.
+    """
+    return pd.Series([_normalize_phone(v, country_code) for v in series.tolist()], index=series.index, dtype=object)
+
+def skip_phone_mask(series):
+    """True where the number as typed starts with SKIP_PHONE_PREFIX (the skip-01 rule)."""
+    return pd.Series([_NON_DIGIT_RE.sub('', v).startswith(SKIP_PHONE_PREFIX) for v in series.tolist()], index=series.index, dtype=bool)
+
+# --- Contact preparation: vectorized CSV → (target, message, name) rows ---
+PHONE_COLUMNS = ('phone', 'phone_number', 'phone_number_e164', 'number')
+EMAIL_COLUMNS = ('email', 'email_address', 'mail', 'recipient')
+USERNAME_COLUMNS = ('username', 'user', 'facebook_username', 'fb_username', 'messenger_username')
+NAME_COLUMNS = ('name', 'contact_name', 'fullname', 'full_name', 'customer_name')
+EMAIL_PATTERN = r'^[^@]+@[^@]+\.[^@]+$'
+SKIP_LOG_LIMIT = 10  # Individual "Skipping ..." log lines per reason before summarizing
+# {column}, {{column}} and either with a default: {city|there}. Single braces take plain
+# identifiers only so ordinary text like "{ }" isn't mistaken for a placeholder.
+_PLACEHOLDER_RE = re.compile(r'\{\{\s*([^{}|]+?)\s*(?:\|([^{}]*))?\}\}|\{([A-Za-z_][\w.-]*)(?:\|([^{}]*))?\}')
+
+def find_column(columns, candidates):
+    """Return the first column whose lowercase name is in candidates, else None."""
+    for c in columns:
+        if c.lower() in candidates:
+            return c
+    return None
+
+def _as_text(series):
+    """str() every value like the old per-row loop did (NaN → 'nan')."""
+    return series.astype(str).fillna('nan')
+
+def _names_or_default(df, col, default):
+    if col is None:
+        return pd.Series(default, index=df.index, dtype=object)
+    values = df[col]
+    return _as_text(values).str.strip().where(values.notna(), default)
+
+class MessageTemplate:
+    """
+    Message text compiled once into literal segments and column placeholders.
+
+    Any CSV column can be referenced as {column} or {{column}}, with an
+    optional default for blank cells: {city|there}. Column names match
+    case-insensitively. A placeholder for a column the CSV doesn't have is
+    left as typed unless it has a default. Values passed in overrides
+    (e.g. the resolved contact name for {name}) take precedence over columns.
+    """
+    
+    def __init__(self, text):
+        self.text = text or ""
+        self.literals = []
+        self.fields = []  # (field, default, raw placeholder text)
+        pos = 0
+        for m in _PLACEHOLDER_RE.finditer(self.text):
+            self.literals.append(self.text[pos:m.start()])
+            field = m.group(1) if m.group(1) is not None else m.group(3)
+            default = m.group(2) if m.group(1) is not None else m.group(4)
+            self.fields.append((field, default.strip() if default is not None else None, m.group(0)))
+            pos = m.end()
+        self.literals.append(self.text[pos:])
+        self._keys = [field.lower() for field, _default, _raw in self.fields]
+        # Distinct placeholders → one value slot each, shared by repeated uses
+        distinct = list(dict.fromkeys(zip(self._keys, self.fields)))
+        self._slot_fields = [(key, default, raw) for key, (_field, default, raw) in distinct]
+        self._slots = [distinct.index(k) for k in zip(self._keys, self.fields)]
+    
+    @property
+    def field_names(self):
+        return [field for field, _default, _raw in self.fields]
+    
+    def columns_used(self, columns):
+        """CSV columns this template reads (for usecols)."""
+        lookup = {c.lower(): c for c in reversed(list(columns))}
+        return [lookup[f.lower()] for f in dict.fromkeys(self.field_names) if f.lower() in lookup]
+    
+    def field_values(self, df, overrides=None):
+        """
+        Resolved substitution values for every row of df, one numpy object array per value slot.
+
+        overrides maps lowercase field → Series aligned with df. Feed a row of
+        these (e.g. zip(*arrays)) to render_values() to render that contact.
+        """
+        overrides = overrides or {}
+        lookup = {c.lower(): c for c in reversed(list(df.columns))}
+        arrays = []
+        cache = {}  # {x} and {{x}} share one normalized column
+        for key, default, raw in self._slot_fields:
+            if key in overrides:
+                values = overrides[key].to_numpy(dtype=object)
+            elif (key, default) in cache:
+                values = cache[key, default]
+            elif key in lookup:
+                column = df[lookup[key]].fillna("").astype(str).str.strip()
+                if default is not None:
+                    column = column.where(column != "", default)
+                values = cache[key, default] = column.to_numpy(dtype=object)
+            else:
+                values = np.full(len(df), default if default is not None else raw, dtype=object)
+            arrays.append(values)
+        return arrays
+    
+    def render_values(self, values):
+        """Render one contact in a single pass from its field_values() row."""
+        parts = [self.literals[0]]
+        for slot, literal in zip(self._slots, self.literals[1:]):
+            parts.append(values[slot])
+            parts.append(literal)
+        return "".join(parts)
+
+class Contact:
+    """
+    One recipient, kept compact until it is sent.
+
+    Holds the target, display name, greeting name, 1-based CSV row and the
+    template's substitution values; the personalized message is only
+    rendered by render(), right before sending. template is None for
+    attachment-only sends (empty message).
+    """
+    
+    __slots__ = ("target", "name", "row", "greeting", "values", "template")
+    
+    def __init__(self, target, name, row, greeting, values, template):
+        self.target = target
+        self.name = name
+        self.row = row
+        self.greeting = greeting
+        self.values = values
+        self.template = template
+    
+    def render(self):
+        if self.template is None:
+            return ""
+        return f"Hello {self.greeting},\n\n" + self.template.render_values(self.values)
+
+def _make_contacts(targets, names, greetings, frame, template, overrides):
+    """Build Contact records for the rows of frame (targets/names/greetings are Series aligned with it)."""
+    rows = (targets.index + 1).tolist()
+    if template is None:
+        values = [()] * len(rows)
+    else:
+        arrays = template.field_values(frame, overrides)
+        values = zip(*arrays) if arrays else [()] * len(rows)
+    return [Contact(target, name, row, greeting, vals, template)
+            for target, name, row, greeting, vals in zip(targets.tolist(), names.tolist(), rows, greetings.tolist(), values)]
+
+
+def _log_skipped(log_fn, label, values):
+    if log_fn is None or len(values) == 0:
+        return
+    for value in values[:SKIP_LOG_LIMIT]:
+        log_fn(f"{label}: {value}")
+    if len(values) > SKIP_LOG_LIMIT:
+        log_fn(f"{label}: ... and {len(values) - SKIP_LOG_LIMIT} more")
+
+def prepare_contacts(df, platform, message, attachment_path=None, row_start=1, row_end=999999, skip_01_numbers=False, log_fn=None, country_code=""):
+    """
+    Turn a contacts DataFrame into the list of Contact records to send.
+
+    Column detection, normalization, validation, the row-range filter and the
+    skip-01 filter all run as pandas column operations instead of iterrows().
+    Row numbers are 1-based DataFrame index labels, as before; Contact.row is
+    the 1-based CSV row the contact came from (used by the send journal).
+    message may be text or an already compiled MessageTemplate. Messages are
+    not rendered here, only the values each one needs. Phone numbers are
+    normalized with normalize_phone_series() and the default country_code;
+    SMS targets are dialable sms_address() strings instead.
+    """
+    template = message if isinstance(message, MessageTemplate) else MessageTemplate(message)
+    df = df[(df.index >= row_start - 1) & (df.index < row_end)]
+    if df.empty:
+        return []
+    
+    if platform == "Email":
+        email_col = find_column(df.columns, EMAIL_COLUMNS)
+        if email_col:
+            name_col = find_column(df.columns, NAME_COLUMNS)
+        else:
+            # Fallback: first column as email, second as name
+            email_col = df.columns[0]
+            name_col = df.columns[1] if len(df.columns) > 1 else None
+        
+        emails = _as_text(df[email_col]).str.strip()
+        valid = emails.str.match(EMAIL_PATTERN).fillna(False).astype(bool)
+        _log_skipped(log_fn, "⚠️ Skipping invalid email", emails[~valid].tolist())
+        emails = emails[valid]
+        names = _names_or_default(df[valid], name_col, "Friend")
+        return _make_contacts(emails, names, names, df[valid], template, {"name": names})
+    
+    elif platform == "Messenger":
+        username_col = find_column(df.columns, USERNAME_COLUMNS)
+        if username_col:
+            name_col = find_column(df.columns, NAME_COLUMNS)
+        else:
+            # Fallback: first column as username, second as name
+            username_col = df.columns[0]
+            name_col = df.columns[1] if len(df.columns) > 1 else None
+        
+        usernames = _as_text(df[username_col]).str.strip()
+        valid = (usernames != '') & (usernames != 'nan')
+        _log_skipped(log_fn, "⚠️ Skipping empty username at row", (usernames.index[~valid] + 1).tolist())
+        usernames = usernames[valid]
+        # {name} uses the name column (or the username); the greeting always uses the username
+        names = _names_or_default(df[valid], name_col, None)
+        names = names.where(names.notna(), usernames)
+        return _make_contacts(usernames, usernames, usernames, df[valid], template, {"name": names})
+    
+    else:
+        # WhatsApp/SMS: phone column
+        phone_col = find_column(df.columns, PHONE_COLUMNS)
+        if phone_col:
+            name_col = find_column(df.columns, NAME_COLUMNS)
+            default_name = "Friend"
+        else:
+            # Fallback: first column as phone, second as name
+            phone_col = df.columns[0]
+            name_col = df.columns[1] if len(df.columns) > 1 else None
+            default_name = "Sir/Ma'am"
+        
+        phones_raw = _as_text(df[phone_col]).str.strip()
+        phones = normalize_phone_series(phones_raw, country_code)
+        
+        keep = pd.Series(True, index=df.index)
+        if skip_01_numbers:
+            skip = skip_phone_mask(phones_raw)
+            _log_skipped(log_fn, "⏭️ Skipping number starting with 01", phones_raw[skip].tolist())
+            keep &= ~skip
+        empty = keep & (phones == '')
+        _log_skipped(log_fn, "⚠️ Skipping invalid phone", phones_raw[empty].tolist())
+        keep &= ~empty
+        
+        phones = phones[keep]
+        if platform == "SMS":
+            phones = pd.Series([sms_address(v, country_code) for v in phones_raw[keep].tolist()],
+                               index=phones.index, dtype=object)
+        names = _names_or_default(df[keep], name_col, default_name)
+        # Attachment without text: no greeting, empty message
+        phone_template = None if attachment_path and not template.text.strip() else template
+        return _make_contacts(phones, names, names, df[keep], phone_template, {"name": names})
+
+# --- Chunked CSV ingestion: read only needed columns/rows, feed contacts as they are ready ---
+def contact_columns(columns, platform, template=None):
+    """Columns prepare_contacts() needs for this platform and message template (used as usecols)."""
+    target_candidates = {"Email": EMAIL_COLUMNS, "Messenger": USERNAME_COLUMNS}.get(platform, PHONE_COLUMNS)
+    target_col = find_column(columns, target_candidates)
+    if target_col:
+        needed = [c for c in (target_col, find_column(columns, NAME_COLUMNS)) if c is not None]
+    else:
+        # Fallback layout: first column is the contact, second the name
+        needed = list(columns[:2])
+    if template is not None:
+        needed += [c for c in template.columns_used(columns) if c not in needed]
+    return needed
+
+class CSVRowIndex:
+    """
+    Sparse byte-offset index of a CSV's data rows, stored as a sidecar file.
+
+    Every ROW_INDEX_STRIDE-th row's byte offset is recorded, so a row range can
+    seek close to row_start and parse only the slice. Quoted fields that span
+    lines and blank (or whitespace-only) lines are accounted for. The sidecar is rebuilt when the
+    CSV's size or mtime changes.
+    """
+
+    def __init__(self, offsets, row_count, stride):
+        self.offsets = offsets
+        self.row_count = row_count
+        self.stride = stride
+
+    @staticmethod
+    def _sidecar_path(csv_path):
+        digest = hashlib.sha1(os.path.abspath(csv_path).encode("utf-8")).hexdigest()
+        return os.path.join(ROW_INDEX_DIR, digest + ".idx")
+
+    @classmethod
+    def load_or_build(cls, csv_path, stride=ROW_INDEX_STRIDE):
+        st = os.stat(csv_path)
+        stamp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "stride": stride, "version": 2}
+        sidecar = cls._sidecar_path(csv_path)
+        try:
+            with open(sidecar, "rb") as f:
+                meta = json.loads(f.readline())
+                if all(meta.get(k) == v for k, v in stamp.items()):
+                    offsets = array("Q")
+                    offsets.frombytes(f.read())
+                    return cls(offsets, meta["rows"], stride)
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        index = cls.build(csv_path, stride)
+        try:
+            os.makedirs(ROW_INDEX_DIR, exist_ok=True)
+            tmp = sidecar + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(json.dumps(dict(stamp, rows=index.row_count)).encode("utf-8") + b"\n")
+                f.write(index.offsets.tobytes())
+            os.replace(tmp, sidecar)
+        except OSError:
+            pass  # Index still usable for this run
+        return index
+
+    @classmethod
+    def build(cls, csv_path, stride=ROW_INDEX_STRIDE):
+        offsets = array("Q")
+        row = -1  # header is row -1, first data row is 0
+        in_quotes = False
+        pos = 0
+        with open(csv_path, "rb") as f:
+            for line in f:
+                if not in_quotes and line.strip():
+                    if row >= 0 and row % stride == 0:
+                        offsets.append(pos)
+                    row += 1
+                if line.count(b'"') % 2:
+                    in_quotes = not in_quotes
+                pos += len(line)
+        return cls(offsets, max(row, 0), stride)
+
+    def locate(self, row_start):
+        """Return (byte_offset, rows_to_skip_after_offset) for 1-based data row row_start, or None.
+
+        rows_to_skip is always below the stride; pass it to skip_csv_rows().
+        """
+        slot = min((row_start - 1) // self.stride, len(self.offsets) - 1)
+        if slot < 0:
+            return None
+        return self.offsets[slot], (row_start - 1) - slot * self.stride
+
+def skip_csv_rows(f, count):
+    """Advance binary file f past `count` CSV rows (quote-aware, blank/whitespace-only lines not counted, like pandas)."""
+    while count > 0:
+        line = f.readline()
+        if not line:
+            return
+        if not line.strip():
+            continue
+        in_quotes = line.count(b'"') % 2 == 1
+        while in_quotes:
+            line = f.readline()
+            if not line:
+                return
+            if line.count(b'"') % 2:
+                in_quotes = False
+        count -= 1
+
+def read_contact_chunks(csv_path, platform, row_start=1, row_end=999999, chunksize=CSV_CHUNK_SIZE, template=None):
+    """
+    Yield DataFrame chunks with only the needed columns of rows row_start..row_end.
+
+    For a late row_start the CSV's row index (CSVRowIndex) is used to seek
+    straight to the nearest recorded byte offset; the few remaining rows (and
+    for early starts, the header and leading rows) are skipped line by line
+    without being parsed into columns. Index labels are kept as 0-based
+    positions in the full file so row numbers match the CSV.
+    """
+    if row_end < row_start:
+        return
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    skip = row_start - 1
+    with open(csv_path, "rb") as f:
+        location = None
+        if row_start > ROW_INDEX_STRIDE:
+            location = CSVRowIndex.load_or_build(csv_path).locate(row_start)
+        if location:
+            offset, skip_rows = location
+            f.seek(offset)
+            skip_csv_rows(f, skip_rows)
+        else:
+            skip_csv_rows(f, skip + 1)  # header + rows before row_start
+        reader = pd.read_csv(
+            f, header=None, names=list(columns), nrows=row_end - skip,
+            usecols=contact_columns(columns, platform, template), dtype=str, chunksize=chunksize,
+        )
+        with reader:
+            for chunk in reader:
+                chunk.index = chunk.index + skip
+                yield chunk
+
+def iter_contacts(csv_path, platform, message, attachment_path=None, row_start=1, row_end=999999, skip_01_numbers=False, log_fn=None, chunksize=CSV_CHUNK_SIZE, country_code=""):
+    """Stream Contact records chunk by chunk, so sending can start before the whole CSV is read."""
+    template = MessageTemplate(message)  # Compiled once for the whole campaign
+    for chunk in read_contact_chunks(csv_path, platform, row_start, row_end, chunksize, template):
+        yield from prepare_contacts(chunk, platform, template, attachment_path, row_start, row_end, skip_01_numbers, log_fn, country_code)
+
+# --- CSV compare: vectorized anti-join of File B against File A ---
+def detect_compare_column(columns):
+    """Return (platform_detected, contact_col) for the compare tool, based on File A's columns."""
+    if 'phone' in columns or 'Phone' in columns:
+        return "WhatsApp/SMS", 'phone' if 'phone' in columns else 'Phone'
+    elif 'email' in columns or 'Email' in columns:
+        return "Email", 'email' if 'email' in columns else 'Email'
+    elif 'username' in columns or 'Username' in columns:
+        return "Messenger", 'username' if 'username' in columns else 'Username'
+    return "Unknown", columns[0]
+
+def normalize_contact_series(series, is_phone, country_code=""):
+    """Normalize a contact column for comparison: phone → normalize_phone_series(), others → stripped lowercase."""
+    text = _as_text(series)
+    if is_phone:
+        return normalize_phone_series(text, country_code)
+    return text.str.strip().str.lower()
+
+def compare_contacts(df_a, df_b, contact_col, is_phone, country_code=""):
+    """
+    Rows of df_b whose normalized contact does not appear in df_a.
+
+    Returns (df_unique, contacts_in_a, duplicate_count). df_unique is a
+    boolean-mask slice of df_b, so original rows and column order are kept.
+    Blank contacts are neither unique nor duplicates.
+    """
+    keys_a = normalize_contact_series(df_a[contact_col], is_phone, country_code)
+    keys_a = pd.Index(keys_a[(keys_a != '') & (keys_a != 'nan')].unique())
+    keys_b = normalize_contact_series(df_b[contact_col], is_phone, country_code)
+    valid = (keys_b != '') & (keys_b != 'nan')
+    in_a = keys_b.isin(keys_a)
+    return df_b[valid & ~in_a], len(keys_a), int((valid & in_a).sum())
+
+# --- Suppression index: contacts already messaged, persisted in SQLite ---
+def suppression_key(platform, target):
+    """Normalized key for a send target: phone → digits (targets are already normalized), email/username → stripped lowercase."""
+    if platform in ("Email", "Messenger"):
+        return str(target).strip().lower()
+    return normalize_phone(target)
+
+class SuppressionIndex:
+    """
+    On-disk set of (platform, contact) pairs that were already messaged successfully.
+
+    Lookups hit the table's primary-key B-tree, so checking a contact costs
+    the same whether the history holds a thousand or a million entries.
+    Safe to share between the email sender threads.
+    """
+    
+    LOOKUP_BATCH = 500  # Keys per IN (...) query, below SQLite's bound-parameter limit
+    
+    def __init__(self, path=SUPPRESSION_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS contacted ("
+                "platform TEXT NOT NULL, contact TEXT NOT NULL, sent_at REAL NOT NULL, "
+                "PRIMARY KEY (platform, contact)) WITHOUT ROWID"
+            )
+            self._conn.commit()
+        self.skipped = 0
+    
+    def count(self, platform):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM contacted WHERE platform = ?", (platform,)).fetchone()[0]
+    
+    def _known_keys(self, platform, keys):
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT contact FROM contacted WHERE platform = ? AND contact IN ({placeholders})",
+                                      [platform, *keys]).fetchall()
+        return {r[0] for r in rows}
+    
+    def filter_new(self, platform, contacts):
+        """Yield the Contact records whose target is not in the index; counts the rest in .skipped."""
+        batch = []
+        for row in contacts:
+            batch.append(row)
+            if len(batch) >= self.LOOKUP_BATCH:
+                yield from self._filter_batch(platform, batch)
+                batch = []
+        if batch:
+            yield from self._filter_batch(platform, batch)
+    
+    def _filter_batch(self, platform, batch):
+        keys = [suppression_key(platform, contact.target) for contact in batch]
+        known = self._known_keys(platform, list(set(keys)))
+        for key, row in zip(keys, batch):
+            if key in known:
+                self.skipped += 1
+            else:
+                yield row
+    
+    def add(self, platform, target):
+        """Record a successful send (committed immediately so a crash doesn't lose it)."""
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO contacted (platform, contact, sent_at) VALUES (?, ?, ?)",
+                               (platform, suppression_key(platform, target), time.time()))
+            self._conn.commit()
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# --- In-run deduplication: send once per normalized recipient ---
+class BloomFilter:
+    """Fixed-size bit array set membership with no false negatives and a bounded false-positive rate."""
+    
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self._steps = np.arange(self.hash_count, dtype=np.uint64)
+    
+    def check_and_add(self, keys):
+        """Add a batch of keys; returns a bool array, True where a key was (probably) already present."""
+        digests = b"".join(hashlib.blake2b(k.encode("utf-8"), digest_size=16).digest() for k in keys)
+        h = np.frombuffer(digests, dtype=np.uint64).reshape(-1, 2)
+        # Double hashing: position i = h1 + i*h2 (uint64 wraparound is fine for hashing)
+        positions = (h[:, :1] + self._steps * (h[:, 1:] | np.uint64(1))) % np.uint64(self.size)
+        byte_index = (positions >> np.uint64(3)).astype(np.intp)
+        bit_mask = np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+        present = np.all(self._bits[byte_index] & bit_mask, axis=1)
+        np.bitwise_or.at(self._bits, byte_index.ravel(), bit_mask.ravel())
+        return present
+
+class RecipientDeduper:
+    """
+    Drop repeat recipients within one run, keyed like the suppression index
+    (so "+977 980..." and "980..." with the default country code are one person).
+
+    Exact by default (a set of keys); with DEDUP_USE_BLOOM_FILTER memory stays
+    fixed however long the list is, and keys are hashed in numpy batches.
+    """
+    
+    BLOOM_BATCH = 10000  # Contacts hashed per Bloom filter batch
+    
+    def __init__(self, platform, use_bloom=DEDUP_USE_BLOOM_FILTER):
+        self.platform = platform
+        self.removed = 0
+        self._bloom = BloomFilter(DEDUP_BLOOM_CAPACITY, DEDUP_BLOOM_ERROR_RATE) if use_bloom else None
+    
+    def filter(self, contacts):
+        """Yield the first Contact for each recipient; later repeats are counted in .removed."""
+        if self._bloom is not None:
+            yield from self._filter_bloom(contacts)
+            return
+        seen = set()
+        platform = self.platform
+        for contact in contacts:
+            key = suppression_key(platform, contact.target)
+            if key in seen:
+                self.removed += 1
+                continue
+            seen.add(key)
+            yield contact
+    
+    def _filter_bloom(self, contacts):
+        batch = []
+        for contact in contacts:
+            batch.append(contact)
+            if len(batch) >= self.BLOOM_BATCH:
+                yield from self._bloom_batch(batch)
+                batch = []
+        if batch:
+            yield from self._bloom_batch(batch)
+    
+    def _bloom_batch(self, batch):
+        keys = [suppression_key(self.platform, contact.target) for contact in batch]
+        present = self._bloom.check_and_add(keys)
+        in_batch = set()  # Repeats inside one batch aren't visible to the filter yet
+        for key, seen, contact in zip(keys, present, batch):
+            if seen or key in in_batch:
+                self.removed += 1
+                continue
+            in_batch.add(key)
+            yield contact
+
+# --- Send journal: append-only per-contact status log for crash-safe resume ---
+class SendJournal:
+    """
+    Append-only log of per-contact send results for one (CSV, platform) campaign.
+
+    Each record is a "row<TAB>status<TAB>target<TAB>timestamp" line. Writes are
+    buffered and fsynced every JOURNAL_FSYNC_EVERY records or
+    JOURNAL_FSYNC_INTERVAL seconds, so a crash loses at most one small batch.
+    The first line is a JSON header with the CSV path, size and mtime.
+    """
+    
+    def __init__(self, csv_path, platform, resume=False):
+        self.csv_path = os.path.abspath(csv_path)
+        self.platform = platform
+        digest = hashlib.sha1(f"{os.path.normcase(self.csv_path)}|{platform}".encode("utf-8")).hexdigest()
+        self.path = os.path.join(JOURNAL_DIR, digest + ".log")
+        self.completed = set()
+        self.csv_changed = False
+        self.sent = self.failed = 0
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        
+        stat = os.stat(csv_path)
+        header = {"csv": self.csv_path, "platform": platform, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        if resume and os.path.exists(self.path):
+            torn = self._load(header)
+            self._file = open(self.path, "a", encoding="utf-8")
+            if torn:
+                self._file.write("\n")  # Terminate the half-written record so the next one starts clean
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._file.write(json.dumps(header) + "\n")
+            self._sync()
+    
+    def _load(self, header):
+        """Collect rows whose latest status is 'sent' or 'unavailable'. A torn last line from a crash is ignored (returns True)."""
+        line = "\n"
+        with open(self.path, encoding="utf-8") as f:
+            try:
+                saved = json.loads(f.readline())
+                self.csv_changed = (saved.get("size"), saved.get("mtime_ns")) != (header["size"], header["mtime_ns"])
+            except ValueError:
+                self.csv_changed = True
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 4 or not parts[0].isdigit():
+                    continue
+                row = int(parts[0])
+                if parts[1] in ("sent", "unavailable"):
+                    self.completed.add(row)
+                else:
+                    self.completed.discard(row)
+        return not line.endswith("\n")
+    
+    def first_pending_row(self, row_start):
+        """Smallest row >= row_start not yet sent, so the CSV reader can jump past the done prefix."""
+        row = row_start
+        while row in self.completed:
+            row += 1
+        return row
+    
+    def filter_pending(self, contacts):
+        """Yield the Contact records whose CSV row isn't already marked sent."""
+        completed = self.completed
+        for contact in contacts:
+            if contact.row not in completed:
+                yield contact
+    
+    def record(self, contact, ok, status=None):
+        """status overrides 'failed', e.g. 'unavailable' for a recipient that can't be messaged (not retried on resume)."""
+        with self._lock:
+            self._file.write(f"{contact.row}\t{'sent' if ok else status or 'failed'}\t{contact.target}\t{time.time():.0f}\n")
+            if ok:
+                self.sent += 1
+            else:
+                self.failed += 1
+            self._pending += 1
+            if self._pending >= JOURNAL_FSYNC_EVERY or time.monotonic() - self._last_sync >= JOURNAL_FSYNC_INTERVAL:
+                self._sync()
+    
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+    
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+# --- CSV compare for files larger than RAM: hash-partitioned buckets on disk ---
+def _partition_keys(csv_path, contact_col, is_phone, bucket_files, with_rows, progress_fn, phase, chunksize, country_code=""):
+    """Stream csv_path and append each row's normalized key to its hash bucket file. Returns rows read."""
+    total_bytes = os.path.getsize(csv_path)
+    rows_read = 0
+    with open(csv_path, "rb") as f:
+        reader = pd.read_csv(f, usecols=[contact_col], dtype=str, keep_default_na=False, chunksize=chunksize)
+        with reader:
+            for chunk in reader:
+                keys = normalize_contact_series(chunk[contact_col], is_phone, country_code).str.replace(r'[\t\r\n]', ' ', regex=True)
+                valid = ((keys != '') & (keys != 'nan')).to_numpy()
+                keys = keys[valid]
+                buckets = pd.util.hash_pandas_object(keys, index=False).to_numpy() % len(bucket_files)
+                key_values = keys.to_numpy()
+                row_numbers = chunk.index.to_numpy()[valid]
+                for b in np.unique(buckets):
+                    mask = buckets == b
+                    if with_rows:
+                        lines = [f"{r}\t{k}" for r, k in zip(row_numbers[mask], key_values[mask])]
+                    else:
+                        lines = key_values[mask].tolist()
+                    bucket_files[b].write("\n".join(lines) + "\n")
+                rows_read += len(chunk)
+                if progress_fn:
+                    progress_fn(phase, f.tell(), total_bytes, rows_read)
+    return rows_read
+
+def compare_csv_external(file_a, file_b, contact_col, is_phone, work_dir, progress_fn=None, buckets=COMPARE_BUCKETS, chunksize=COMPARE_CHUNK_SIZE, country_code=""):
+    """
+    Out-of-core version of compare_contacts() for files larger than RAM.
+
+    Pass 1 hash-partitions the normalized keys of both files into bucket files
+    in work_dir (File B keys carry their row number). Pass 2 loads one bucket
+    at a time and marks File B rows whose key is not in File A's bucket.
+    Memory is bounded by one bucket plus a 1-byte-per-row keep mask.
+
+    Returns (keep_mask, rows_a, rows_b, contacts_in_a, unique_count, duplicate_count).
+    progress_fn(phase, bytes_done, bytes_total, rows_done) is called after each chunk.
+    """
+    paths_a = [os.path.join(work_dir, f"a_{i}.txt") for i in range(buckets)]
+    paths_b = [os.path.join(work_dir, f"b_{i}.txt") for i in range(buckets)]
+    files = [open(p, "w", encoding="utf-8", newline="\n") for p in paths_a + paths_b]
+    try:
+        rows_a = _partition_keys(file_a, contact_col, is_phone, files[:buckets], False, progress_fn, "Partitioning File A", chunksize, country_code)
+        rows_b = _partition_keys(file_b, contact_col, is_phone, files[buckets:], True, progress_fn, "Partitioning File B", chunksize, country_code)
+    finally:
+        for f in files:
+            f.close()
+    
+    keep = np.zeros(rows_b, dtype=bool)
+    contacts_in_a = duplicate_count = 0
+    bucket_bytes = sum(os.path.getsize(p) for p in paths_a + paths_b)
+    done_bytes = 0
+    for path_a, path_b in zip(paths_a, paths_b):
+        with open(path_a, encoding="utf-8") as f:
+            keys_a = set(f.read().split("\n"))
+        keys_a.discard("")
+        contacts_in_a += len(keys_a)
+        if os.path.getsize(path_b):
+            bucket_b = pd.read_csv(path_b, sep="\t", header=None, names=["row", "key"], dtype={"row": "int64", "key": str},
+                                   keep_default_na=False, quoting=3)
+            in_a = bucket_b["key"].isin(keys_a).to_numpy()
+            keep[bucket_b["row"].to_numpy()[~in_a]] = True
+            duplicate_count += int(in_a.sum())
+        done_bytes += os.path.getsize(path_a) + os.path.getsize(path_b)
+        os.remove(path_a)
+        os.remove(path_b)
+        if progress_fn:
+            progress_fn("Comparing buckets", done_bytes, bucket_bytes, int(keep.sum()))
+    return keep, rows_a, rows_b, contacts_in_a, int(keep.sum()), duplicate_count
+
+class CompareCancelled(Exception):
+    """Raised from a compare progress callback to abort between chunks."""
+
+def read_csv_in_chunks(csv_path, phase, progress_fn=None, chunksize=COMPARE_CHUNK_SIZE):
+    """Read a whole CSV as text in chunks, reporting progress (and letting progress_fn abort) between chunks."""
+    total_bytes = os.path.getsize(csv_path)
+    chunks = []
+    rows_read = 0
+    with open(csv_path, "rb") as f:
+        reader = pd.read_csv(f, dtype=str, keep_default_na=False, chunksize=chunksize)
+        with reader:
+            for chunk in reader:
+                chunks.append(chunk)
+                rows_read += len(chunk)
+                if progress_fn:
+                    progress_fn(phase, f.tell(), total_bytes, rows_read)
+    if not chunks:
+        return pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    return pd.concat(chunks)
+
+def write_rows_by_mask(csv_path, keep, output_file, progress_fn=None, chunksize=COMPARE_CHUNK_SIZE):
+    """Stream csv_path to output_file keeping only rows where keep[row] is True (original text and column order)."""
+    total_bytes = os.path.getsize(csv_path)
+    rows_written = 0
+    header = True
+    with open(csv_path, "rb") as f:
+        reader = pd.read_csv(f, dtype=str, keep_default_na=False, chunksize=chunksize)
+        with reader:
+            for chunk in reader:
+                selected = chunk[keep[chunk.index.to_numpy()]]
+                selected.to_csv(output_file, index=False, header=header, mode="w" if header else "a")
+                header = False
+                rows_written += len(selected)
+                if progress_fn:
+                    progress_fn("Writing unique rows", f.tell(), total_bytes, rows_written)
+    return rows_written
+
+# --- Composer text insertion: the whole message in one operation ---
+# Synthetic paste: WhatsApp's and Messenger's editors turn pasted newlines into line
+# breaks (never a send) and take any Unicode, including non-BMP emoji.
+_PASTE_TEXT_JS = """
+const box = arguments[0];
+box.focus();
+const data = new DataTransfer();
+data.setData('text/plain', arguments[1]);
+box.dispatchEvent(new ClipboardEvent('paste', {clipboardData: data, bubbles: true, cancelable: true}));
+"""
+
+_SHIFT_ENTER_KEY = {"key": "Enter", "code": "Enter", "windowsVirtualKeyCode": 13, "modifiers": 8}  # 8 = Shift
+
+def _composer_has_text(driver, element, message):
+    """True if the composer now shows the message (whitespace-insensitive)."""
+    shown = driver.execute_script("return arguments[0].innerText;", element) or ""
+    return " ".join(shown.split()) == " ".join(message.split())
+
+def _clear_composer(element):
+    element.send_keys(Keys.CONTROL + "a")
+    element.send_keys(Keys.BACKSPACE)
+
+def type_lines(element, message):
+    """Keystroke path: one send_keys per line with SHIFT+ENTER between lines."""
+    lines = message.split('\n')
+    for i, line in enumerate(lines):
+        if line.strip():  # Only send non-empty lines
+            element.send_keys(line)
+        # Add line break except for the last line
+        if i < len(lines) - 1:
+            element.send_keys(Keys.SHIFT + Keys.ENTER)
+
+def insert_message_text(driver, element, message):
+    """
+    Put a multi-line message into a contenteditable composer without per-key typing.
+
+    Tries a synthetic paste (one WebDriver call), then CDP Input.insertText per
+    line with Shift+Enter key events between lines, and falls back to
+    type_lines(). Each bulk attempt is verified against the composer's text
+    and cleared if it only partly landed. Returns the method used: "paste",
+    "cdp" or "keys".
+    """
+    element.click()
+    try:
+        driver.execute_script(_PASTE_TEXT_JS, element, message)
+        if _composer_has_text(driver, element, message):
+            return "paste"
+        _clear_composer(element)
+    except Exception:
+        pass
+    
+    if hasattr(driver, "execute_cdp_cmd"):
+        try:
+            element.click()
+            lines = message.split('\n')
+            for i, line in enumerate(lines):
+                if line:
+                    driver.execute_cdp_cmd("Input.insertText", {"text": line})
+                if i < len(lines) - 1:
+                    driver.execute_cdp_cmd("Input.dispatchKeyEvent", {"type": "keyDown", **_SHIFT_ENTER_KEY})
+                    driver.execute_cdp_cmd("Input.dispatchKeyEvent", {"type": "keyUp", **_SHIFT_ENTER_KEY})
+            if _composer_has_text(driver, element, message):
+                return "cdp"
+            _clear_composer(element)
+        except Exception:
+            pass
+    
+    element.click()
+    type_lines(element, message)
+    return "keys"
+
+# --- Adaptive selector/method cache: try whatever worked last time first ---
+class StrategyCache:
+    """Per-session memory of which selector or method won each step; the winner is tried first next time.
+
+    A hit means the remembered strategy worked on the first try; a miss means it was
+    not known yet or failed and the others had to be tried. Time spent is tracked for both
+    so the end-of-run log shows what the cache saves.
+    """
+    
+    def __init__(self):
+        self._winners = {}
+        self._stats = {}  # step -> [hits, misses, not found, hit seconds, miss seconds]
+        self._disabled = set()
+        self._lock = threading.Lock()
+    
+    def disable(self, step):
+        """Stop trying this step for the rest of the session (run() returns (None, None) right away)."""
+        self._disabled.add(step)
+    
+    def order(self, step, strategies):
+        winner = self._winners.get(step)
+        if winner not in strategies:
+            return list(strategies)
+        return [winner] + [s for s in strategies if s != winner]
+    
+    def run(self, step, strategies, attempt):
+        """Call attempt(strategy) in cached order until one returns a truthy result.
+        
+        Exceptions count as a failed strategy. Returns (strategy, result), or (None, None)
+        if every strategy failed.
+        """
+        if step in self._disabled:
+            return None, None
+        start = time.perf_counter()
+        remembered = self._winners.get(step)
+        for strategy in self.order(step, strategies):
+            try:
+                result = attempt(strategy)
+            except Exception:
+                result = None
+            if result:
+                with self._lock:
+                    self._winners[step] = strategy
+                    self._count(step, 0 if strategy == remembered else 1, time.perf_counter() - start)
+                return strategy, result
+        with self._lock:
+            self._count(step, 2, time.perf_counter() - start)
+        return None, None
+    
+    def _count(self, step, slot, seconds):
+        stats = self._stats.setdefault(step, [0, 0, 0, 0.0, 0.0])
+        stats[slot] += 1
+        stats[3 if slot == 0 else 4] += seconds
+    
+    def counts(self):
+        """{step: {"hits", "misses", "not_found", "hit_ms", "miss_ms"}} for reporting."""
+        with self._lock:
+            return {step: {"hits": hits, "misses": misses, "not_found": not_found,
+                           "hit_ms": hit_s / hits * 1000 if hits else 0.0,
+                           "miss_ms": miss_s / (misses + not_found) * 1000 if misses + not_found else 0.0}
+                    for step, (hits, misses, not_found, hit_s, miss_s) in self._stats.items()}
+    
+    def summary(self):
+        parts = []
+        for step, c in self.counts().items():
+            part = f"{step} {c['hits']} hits / {c['misses']} misses"
+            if c["not_found"]:
+                part += f" / {c['not_found']} not found"
+            if c["hits"]:
+                part += f" (hit {c['hit_ms']:.0f} ms vs miss {c['miss_ms']:.0f} ms)"
+            parts.append(part)
+        return " | ".join(parts)
+
+# --- In-app (SPA) chat navigation, falling back to a full driver.get ---
+# Clicks a link the app's own router handles; a window-level listener cancels the click if the app didn't,
+# so an unhandled link never navigates the page away.
+_SPA_CLICK_JS = """
+const link = arguments[0];
+let handled = false;
+const guard = e => { handled = e.defaultPrevented; if (!handled) e.preventDefault(); };
+window.addEventListener('click', guard);
+try { link.click(); } finally { window.removeEventListener('click', guard); }
+return handled;
+"""
+
+# WhatsApp opens wa.me links inside the app; the current #main is marked so a fresh one can be told apart
+_WA_SPA_OPEN_JS = """
+const side = document.querySelector('#side');
+if (location.host !== 'web.whatsapp.com' || !side) return null;
+const main = document.querySelector('#main');
+if (main) main.setAttribute('data-automator-prev', '');
+const link = document.createElement('a');
+link.href = 'https://wa.me/' + arguments[0];
+link.style.display = 'none';
+side.appendChild(link);
+return link;
+"""
+
+_WA_SPA_SETTLED_JS = """
+const main = document.querySelector('#main');
+if (main && !main.hasAttribute('data-automator-prev')) return true;
+return [...document.querySelectorAll('[data-animate-modal-popup="true"], [role="dialog"]')]
+    .some(popup => /invalid/i.test(popup.innerText || ''));
+"""
+
+# Messenger: only conversations already linked in the sidebar can be opened in-app
+_MESSENGER_SPA_OPEN_JS = """
+const want = '/t/' + arguments[0];
+const link = [...document.querySelectorAll('a[href*="/t/"]')]
+    .find(a => new URL(a.href, location.href).pathname.replace(/\\/$/, '') === want);
+if (!link || location.pathname.replace(/\\/$/, '') === want) return null;
+document.querySelectorAll('div[role="textbox"][contenteditable="true"]')
+    .forEach(el => el.setAttribute('data-automator-prev', ''));
+return link;
+"""
+
+_MESSENGER_SPA_SETTLED_JS = """
+return location.pathname.replace(/\\/$/, '') === '/t/' + arguments[0]
+    && !!document.querySelector('div[role="textbox"][contenteditable="true"]:not([data-automator-prev])');
+"""
+
+def open_chat(driver, url, target, open_js, settled_js, strategies, step, phases, log_fn):
+    """
+    Switch to target's chat, in-app when possible, otherwise with driver.get(url).
+    
+    Returns "in-app" or "reload". The in-app attempt costs nothing when the link isn't
+    there or the app ignores the click; if a taken click doesn't settle within
+    SPA_NAV_TIMEOUT, in-app navigation is disabled for the rest of the session.
+    """
+    def attempt(_):
+        link = driver.execute_script(open_js, target)
+        if not link or not driver.execute_script(_SPA_CLICK_JS, link):
+            return False
+        try:
+            return timed_wait(driver, phases, "navigate", lambda d: d.execute_script(settled_js, target), SPA_NAV_TIMEOUT)
+        except TimeoutException:
+            strategies.disable(step)
+            log_fn(f"  ⚠️ In-app navigation didn't settle in {SPA_NAV_TIMEOUT}s, reloading per contact from now on")
+            return False
+    
+    if SPA_NAVIGATION:
+        try:
+            mode, _ = strategies.run(step, ["in-app"], attempt)
+        except Exception:
+            mode = None
+        if mode:
+            return mode
+    start = time.perf_counter()
+    driver.get(url)
+    phases["navigate"] = phases.get("navigate", 0.0) + time.perf_counter() - start
+    return "reload"
+
+# --- WhatsApp Web: condition-based waits with per-phase timing ---
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v')
+
+class PhaseStats:
+    """Run-wide time spent per send phase (chat-ready, preview, upload, tick), for the end-of-run log."""
+    
+    def __init__(self):
+        self._totals = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+    
+    def add(self, phases):
+        with self._lock:
+            for phase, seconds in phases.items():
+                self._totals[phase] = self._totals.get(phase, 0.0) + seconds
+                self._counts[phase] = self._counts.get(phase, 0) + 1
+    
+    def summary(self):
+        with self._lock:
+            return " | ".join(f"{phase} avg {self._totals[phase] / self._counts[phase] * 1000:.0f} ms"
+                              for phase in self._totals)
+
+def format_phases(phases):
+    return " · ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in phases.items())
+
+def timed_wait(driver, phases, phase, condition, timeout):
+    """WebDriverWait(...).until(condition), polling every WAIT_POLL_INTERVAL; time spent goes to phases[phase]."""
+    start = time.perf_counter()
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_INTERVAL).until(condition)
+    finally:
+        phases[phase] = phases.get(phase, 0.0) + time.perf_counter() - start
+
+_WA_UPLOAD_COMPLETE_JS = """
+const send = document.querySelector('span[data-icon="send"]');
+if (!send) return false;
+const button = send.closest('button, [role="button"]');
+if (button && button.getAttribute('aria-disabled') === 'true') return false;
+// Look for progress only inside the media preview: the nearest ancestor of the send button that holds
+// the preview media, as long as it hasn't grown to include the chat list
+let preview = send.parentElement;
+while (preview && preview !== document.body && !preview.querySelector('img, video, canvas')) preview = preview.parentElement;
+if (!preview || preview === document.body || preview.querySelector('#side, #pane-side')) return true;
+return !preview.querySelector('[role="progressbar"], span[data-icon="media-cancel"]');
+"""
+
+_WA_OUTGOING_COUNT_JS = "return document.querySelectorAll('#main div.message-out').length;"
+
+_WA_LAST_TICK_JS = """
+const outgoing = document.querySelectorAll('#main div.message-out');
+if (outgoing.length <= arguments[0]) return false;
+const last = outgoing[outgoing.length - 1];
+return !!last.querySelector('[data-icon="msg-check"], [data-icon="msg-dblcheck"], [data-icon="msg-dblcheck-ack"]');
+"""
+
+class RecipientUnavailableError(Exception):
+    """The recipient can't be messaged on this platform (e.g. number not on WhatsApp); retrying won't help."""
+    
+    def __init__(self, target, reason):
+        super().__init__(f"{target}: {reason}")
+        self.target = target
+        self.reason = reason
+
+_WA_CHAT_STATE_JS = """
+for (const popup of document.querySelectorAll('[data-animate-modal-popup="true"], [role="dialog"]')) {
+    const text = (popup.innerText || '').trim();
+    if (/invalid/i.test(text)) return ['invalid', text];
+}
+const box = document.querySelector('div[contenteditable="true"][data-tab="10"]');
+if (box && box.getClientRects().length && !box.closest('[data-automator-prev]')) return ['ready', box];
+return null;
+"""
+
+_WA_DISMISS_POPUP_JS = """
+const popup = document.querySelector('[data-animate-modal-popup="true"], [role="dialog"]');
+const ok = popup && popup.querySelector('button, [role="button"]');
+if (ok) ok.click();
+"""
+
+def wa_chat_state(driver):
+    """Condition racing chat-ready against the invalid-number dialog: ("ready", input box) or ("invalid", dialog text)."""
+    return driver.execute_script(_WA_CHAT_STATE_JS) or False
+
+def wa_media_preview_ready(driver):
+    """Condition: the attachment preview's send button is rendered."""
+    for el in driver.find_elements(By.XPATH, '//span[@data-icon="send"]'):
+        if el.is_displayed():
+            return el
+    return False
+
+def wa_upload_complete(driver):
+    """Condition: media finished processing (send enabled, no progress indicator)."""
+    return driver.execute_script(_WA_UPLOAD_COMPLETE_JS)
+
+def wa_outgoing_count(driver):
+    try:
+        return driver.execute_script(_WA_OUTGOING_COUNT_JS) or 0
+    except Exception:
+        return 0
+
+def wait_for_sent_tick(driver, phases, outgoing_before, log_fn):
+    """Wait until a new outgoing message shows a sent/delivered tick. Returns False on timeout (still pending)."""
+    try:
+        timed_wait(driver, phases, "tick", lambda d: d.execute_script(_WA_LAST_TICK_JS, outgoing_before), WA_TICK_TIMEOUT)
+        return True
+    except TimeoutException:
+        log_fn(f"  ⚠️ No sent tick after {WA_TICK_TIMEOUT}s - message may still be pending")
+        return False
 
 # --- Helper: create Chrome driver on demand (so GUI can start first) ---
 def create_driver(profile_dir=PROFILE_DIR, headless=HEADLESS):
@@ -69,26 +1288,232 @@ def create_driver(profile_dir=PROFILE_DIR, headless=HEADLESS):
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_argument("--disable-infobars")
     options.add_argument("--disable-extensions")
-    options.add_argument("--disable-images")
-    options.add_argument("--disable-plugins")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
     options.add_experimental_option("prefs", {
         "profile.default_content_setting_values.notifications": 2,
         "profile.default_content_settings.popups": 0
     })
-    driver_path = ChromeDriverManager().install()
-    service = Service(driver_path)
-    driver = webdriver.Chrome(service=service, options=options)
+    driver_path, cached = resolve_driver_path()
+    try:
+        driver = webdriver.Chrome(service=Service(driver_path), options=options)
+    except SessionNotCreatedException as e:
+        if not cached or not is_driver_version_mismatch(e):
+            raise
+        # Cached driver no longer matches Chrome (e.g. Chrome auto-updated): resolve again once
+        driver_path, _ = resolve_driver_path(refresh=True)
+        driver = webdriver.Chrome(service=Service(driver_path), options=options)
     # hide webdriver flag
     try:
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => false});")
     except Exception:
         pass
+    driver.blocked_url_patterns = block_heavy_resources(driver) if BLOCK_HEAVY_RESOURCES else []
     return driver
 
+def resolve_driver_path(refresh=False):
+    """
+    ChromeDriver path, cached in DRIVER_CACHE_FILE so ChromeDriverManager's version
+    check/download only runs the first time or with refresh=True.
+    Returns (path, came_from_cache).
+    """
+    if not refresh:
+        try:
+            with open(DRIVER_CACHE_FILE, encoding="utf-8") as f:
+                path = json.load(f).get("path")
+            if path and os.path.isfile(path):
+                return path, True
+        except (OSError, ValueError, AttributeError):
+            pass
+    path = ChromeDriverManager().install()
+    try:
+        os.makedirs(os.path.dirname(DRIVER_CACHE_FILE), exist_ok=True)
+        with open(DRIVER_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"path": path, "resolved_at": time.time()}, f)
+    except OSError:
+        pass
+    return path, False
+
+def is_driver_version_mismatch(error):
+    """Whether Chrome refused the session because ChromeDriver was built for another Chrome version."""
+    text = str(error).lower()
+    return "only supports chrome version" in text or "current browser version" in text
+
+# --- Browser pre-launch and login detection ---
+PLATFORM_HOME_URLS = {"WhatsApp": "https://web.whatsapp.com", "Messenger": "https://www.messenger.com"}
+
+class BrowserPrewarmer:
+    """
+    Starts Chrome and opens the platform's web app in a background thread so START can take a ready session.
+    Only one Chrome can use PROFILE_DIR at a time, so anything that needs the browser goes through here.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._driver = None
+    
+    def start(self, platform, log_fn):
+        """Begin launching (no-op if not a browser platform or a launch is already running/ready)."""
+        if platform not in PLATFORM_HOME_URLS:
+            return
+        with self._lock:
+            if self._thread is not None or self._driver is not None:
+                return
+            self._thread = threading.Thread(target=self._launch, args=(platform, log_fn), daemon=True)
+            self._thread.start()
+    
+    def _launch(self, platform, log_fn):
+        start = time.perf_counter()
+        try:
+            driver = create_driver()
+            driver.get(PLATFORM_HOME_URLS[platform])
+        except Exception as e:
+            log_fn(f"⚠️ Browser pre-launch failed: {e}")
+            return
+        with self._lock:
+            self._driver = driver
+        log_fn(f"🔥 Browser pre-launched for {platform} in {time.perf_counter() - start:.1f}s")
+    
+    def take(self):
+        """Hand over the pre-launched driver, waiting for a launch in progress. None if there isn't a live one.
+
+        Blocks on the launch thread, so never call it from the Tk thread.
+        """
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            driver, self._driver, self._thread = self._driver, None, None
+        if driver is None:
+            return None
+        try:
+            driver.current_url  # The user may have closed the window in the meantime
+        except Exception:
+            try:
+                driver.quit()  # Don't leave a dead chromedriver holding the profile
+            except Exception:
+                pass
+            return None
+        return driver
+    
+    def keep(self, driver):
+        """Hold an open driver as the ready session for the next take()."""
+        with self._lock:
+            self._driver = driver
+
+browser_prewarmer = BrowserPrewarmer()
+
+_LOGIN_STATE_JS = {
+    "WhatsApp": """
+if (document.querySelector('#side, #pane-side')) return 'in';
+if (document.querySelector('canvas[aria-label], div[data-ref]')) return 'login';
+return null;
+""",
+    "Messenger": """
+if (/login|checkpoint/.test(location.pathname) || document.querySelector('input[name="pass"]')) return 'login';
+if (document.querySelector('[role="navigation"], a[href*="/t/"]')) return 'in';
+return null;
+""",
+}
+
+def wait_for_login(driver, platform, log_fn, stop_event, timeout=LOGIN_TIMEOUT):
+    """Poll until the web app shows the logged-in UI (prompting once if it shows a login/QR page). Returns bool."""
+    deadline = time.monotonic() + timeout
+    prompted = False
+    while not stop_event.is_set() and time.monotonic() < deadline:
+        try:
+            state = driver.execute_script(_LOGIN_STATE_JS[platform])
+        except Exception:
+            state = None
+        if state == "in":
+            return True
+        if state == "login" and not prompted:
+            prompted = True
+            if platform == "WhatsApp":
+                log_fn(f"📱 Please scan QR code in WhatsApp Web (waiting up to {timeout}s)...")
+            else:
+                log_fn(f"📱 Please log in to Facebook Messenger (waiting up to {timeout}s)...")
+        time.sleep(WAIT_POLL_INTERVAL)
+    return False
+
+# --- Browser network usage: DevTools URL blocking and per-message Performance API sampling ---
+def _pattern_host(pattern):
+    """Host part of a Network.setBlockedURLs pattern; "*" when the pattern can match any host."""
+    if "://" in pattern:
+        return pattern.split("://", 1)[1].split("/", 1)[0] or "*"
+    if pattern.startswith("*"):
+        return "*"  # e.g. "*.jpg": the leading * spans scheme and host
+    return pattern.split("/", 1)[0]
+
+def _hosts_overlap(a, b):
+    """Whether two host globs can match a common host (checked with sample expansions of each)."""
+    def samples(glob):
+        return {glob.replace("*", fill) for fill in ("", "x", "x.x")}
+    return (any(fnmatch.fnmatchcase(h, b) for h in samples(a))
+            or any(fnmatch.fnmatchcase(h, a) for h in samples(b)))
+
+def safe_block_patterns(patterns):
+    """Drop any pattern whose host part could match a host in NEVER_BLOCK_HOSTS."""
+    return [p for p in patterns
+            if not any(_hosts_overlap(_pattern_host(p).lower(), host) for host in NEVER_BLOCK_HOSTS)]
+
+def block_heavy_resources(driver, patterns=None):
+    """Block BLOCKED_URL_PATTERNS for this tab through CDP. Returns the patterns applied ([] if unsupported)."""
+    patterns = safe_block_patterns(BLOCKED_URL_PATTERNS if patterns is None else patterns)
+    if not patterns:
+        return []
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception:
+        return []
+    return patterns
+
+# Resource entries since the last call (the page's navigation entry only once per load), then reset
+_NETWORK_USAGE_JS = """
+let entries = performance.getEntriesByType('resource');
+if (!window.__automatorNavCounted) {
+    entries = entries.concat(performance.getEntriesByType('navigation'));
+    window.__automatorNavCounted = true;
+}
+let bytes = 0, ms = 0;
+for (const e of entries) { bytes += e.transferSize || 0; ms += e.duration || 0; }
+performance.clearResourceTimings();
+performance.setResourceTimingBufferSize(5000);
+return [entries.length, bytes, ms];
+"""
+
+class NetworkStats:
+    """Run-wide browser network usage per message, from the Performance API (bytes are a lower bound:
+    cross-origin responses without Timing-Allow-Origin report a transfer size of 0)."""
+    
+    def __init__(self):
+        self.messages = self.requests = self.bytes = 0
+        self.ms = 0.0
+    
+    def sample(self, driver, count=True):
+        """Read and reset the page's resource timings; count=False just discards them (e.g. login page load)."""
+        try:
+            requests, transferred, ms = driver.execute_script(_NETWORK_USAGE_JS)
+        except Exception:
+            return
+        if count:
+            self.messages += 1
+            self.requests += requests
+            self.bytes += transferred
+            self.ms += ms
+    
+    def summary(self):
+        if not self.messages:
+            return ""
+        n = self.messages
+        return (f"{self.bytes / n / 1024:.0f} KB, {self.requests / n:.0f} requests, "
+                f"{self.ms / n / 1000:.1f} s resource time per message")
+
 # --- Messaging actions (WhatsApp with attachment support) ---
-def send_message_whatsapp(driver, phone, message, log_fn, stop_event, attachment_path=None, delay_seconds=60):
+def send_message_whatsapp(driver, phone, message, log_fn, stop_event, attachment_path=None, delay_seconds=60, phase_stats=None, strategies=None):
     """
     Send a WhatsApp message to a single phone number using a Selenium driver.
     Compatible with web.whatsapp.com, assuming user is logged in.
@@ -101,10 +1526,29 @@ def send_message_whatsapp(driver, phone, message, log_fn, stop_event, attachment
         stop_event: threading.Event, used to stop execution gracefully
         attachment_path: str, optional path to file to attach (PDF, PNG, JPG, etc.)
         delay_seconds: int, number of seconds to wait after sending (default: 60)
+        phase_stats: PhaseStats, optional run-wide collector for the per-phase wait times
+        strategies: StrategyCache, optional session cache of which caption/send method worked
+    
+    Raises:
+        RecipientUnavailableError: the number isn't on WhatsApp (detected from the invalid-number dialog)
     """
     if stop_event.is_set():
         log_fn("Stopped before sending.")
         return False
+    
+    strategies = strategies or StrategyCache()
+    phases = {}  # Seconds actually spent waiting in each phase of this send
+    
+    def insert_text(box):
+        start = time.perf_counter()
+        method = insert_message_text(driver, box, message)
+        phases[f"insert ({method})"] = time.perf_counter() - start
+    
+    def finish_phases():
+        if phases:
+            log_fn(f"  ⏱️ {format_phases(phases)}")
+            if phase_stats is not None:
+                phase_stats.add(phases)
 
     try:
         # Format phone correctly
@@ -115,21 +1559,26 @@ def send_message_whatsapp(driver, phone, message, log_fn, stop_event, attachment
         if phone.startswith("+"):
             phone = phone[1:]
 
-        # Navigate to chat URL
+        # Navigate to chat (in-app when the loaded WhatsApp Web can do it, else a full page load)
         url = f"https://web.whatsapp.com/send?phone={phone}&app_absent=0"
-        driver.get(url)
-        log_fn(f"Opening chat with {phone}...")
-        time.sleep(3)
+        mode = open_chat(driver, url, phone, _WA_SPA_OPEN_JS, _WA_SPA_SETTLED_JS, strategies, "wa-navigate", phases, log_fn)
+        log_fn(f"Opening chat with {phone}{' (in-app)' if mode == 'in-app' else ''}...")
 
-        # Wait for input box
-        wait = WebDriverWait(driver, 15)
+        # Wait for the chat composer, or bail out as soon as WhatsApp says the number is invalid
+        wait = WebDriverWait(driver, 15, poll_frequency=WAIT_POLL_INTERVAL)
         try:
-            input_box = wait.until(
-                EC.element_to_be_clickable((By.XPATH, '//div[@contenteditable="true"][@data-tab="10"]'))
-            )
+            state, detail = timed_wait(driver, phases, "chat-ready", wa_chat_state, WA_CHAT_READY_TIMEOUT)
         except TimeoutException:
             log_fn(f"⏳ Timeout: Chat not ready for {phone}")
+            finish_phases()
             return False
+        if state == "invalid":
+            finish_phases()
+            try:
+                driver.execute_script(_WA_DISMISS_POPUP_JS)
+            except Exception:
+                pass
+            raise RecipientUnavailableError(phone, "not on WhatsApp")
 
         if stop_event.is_set():
             log_fn("Stopped before typing message.")
@@ -144,29 +1593,31 @@ def send_message_whatsapp(driver, phone, message, log_fn, stop_event, attachment
                     EC.element_to_be_clickable((By.XPATH, '//div[@title="Attach" or @aria-label="Attach"]'))
                 )
                 attach_btn.click()
-                time.sleep(1.5)
                 
-                # Find and click the file input for document/image
+                # Find the file input for document/image (appears once the attach menu opens)
                 file_input = wait.until(
                     EC.presence_of_element_located((By.XPATH, '//input[@accept="*" or @type="file"]'))
                 )
                 file_input.send_keys(os.path.abspath(attachment_path))
                 log_fn(f"  ✅ File uploaded: {os.path.basename(attachment_path)}")
                 
-                # Check file extension for video files - they need more time to process
-                file_ext = os.path.splitext(attachment_path)[1].lower()
-                if file_ext in ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v']:
+                # Wait for the preview, then for processing to finish (videos get a longer timeout)
+                upload_timeout = WA_UPLOAD_TIMEOUT
+                if os.path.splitext(attachment_path)[1].lower() in VIDEO_EXTENSIONS:
                     log_fn(f"  📹 Video detected - waiting for processing...")
-                    time.sleep(8)  # Videos need more time to process
-                else:
-                    time.sleep(4)  # Images/documents
+                    upload_timeout *= 2
+                media_timed_out = False
+                try:
+                    timed_wait(driver, phases, "preview", wa_media_preview_ready, WA_PREVIEW_TIMEOUT)
+                    timed_wait(driver, phases, "upload", wa_upload_complete, upload_timeout)
+                except TimeoutException:
+                    # Still try to send (as the old fixed sleep did), but only count it once the tick confirms
+                    media_timed_out = True
+                    log_fn(f"  ⚠️ Media not ready after waiting, trying to send anyway...")
                 
                 # Add caption if message provided
                 if message and message.strip():
                     try:
-                        # Wait for preview to fully load
-                        time.sleep(1)
-                        
                         # Try multiple selectors for caption box
                         caption_box = None
                         caption_selectors = [
@@ -177,31 +1628,21 @@ def send_message_whatsapp(driver, phone, message, log_fn, stop_event, attachment
                             '//div[contains(@aria-placeholder, "Add a caption")]',
                         ]
                         
-                        for selector in caption_selectors:
-                            try:
-                                caption_box = driver.find_element(By.XPATH, selector)
-                                log_fn(f"  ✅ Caption box found with selector: {selector[:40]}...")
-                                break
-                            except:
-                                continue
+                        selector, caption_box = strategies.run(
+                            "wa-caption", caption_selectors,
+                            lambda sel: driver.find_element(By.XPATH, sel))
+                        if caption_box:
+                            log_fn(f"  ✅ Caption box found with selector: {selector[:40]}...")
                         
                         if caption_box:
-                            # Scroll into view and focus
+                            # Scroll into view and focus (synchronous script calls, no settle time needed)
                             driver.execute_script("arguments[0].scrollIntoView(true);", caption_box)
-                            time.sleep(0.3)
                             driver.execute_script("arguments[0].focus();", caption_box)
-                            time.sleep(0.3)
                             driver.execute_script("arguments[0].click();", caption_box)
-                            time.sleep(0.5)
                             
-                            # Type caption
+                            # Insert caption
                             log_fn(f"  📝 Typing caption...")
-                            lines = message.split('\n')
-                            for i, line in enumerate(lines):
-                                if line.strip():
-                                    caption_box.send_keys(line)
-                                if i < len(lines) - 1:
-                                    caption_box.send_keys(Keys.SHIFT + Keys.ENTER)
+                            insert_text(caption_box)
                             
                             log_fn(f"  ✅ Caption added successfully!")
                         else:
@@ -210,71 +1651,70 @@ def send_message_whatsapp(driver, phone, message, log_fn, stop_event, attachment
                     except Exception as e:
                         log_fn(f"  ⚠️ Caption error: {str(e)[:80]}")
                 
-                # Wait a bit before sending
-                time.sleep(2)
+                # Upload confirmed sendable above (unless the media wait timed out)
                 log_fn(f"  📤 Sending attachment...")
+                outgoing_before = wa_outgoing_count(driver)
                 
-                # Try multiple methods to click send button
-                send_clicked = False
-                
-                # Method 1: Try clicking green send button icon (attachment preview)
-                try:
+                # Try multiple methods to click send button (last winner first)
+                def send_via_icon():
+                    # Green send button icon (attachment preview)
                     send_btn = driver.find_element(By.XPATH, '//span[@data-icon="send"]')
                     driver.execute_script("arguments[0].scrollIntoView(true);", send_btn)
-                    time.sleep(0.5)
                     driver.execute_script("arguments[0].click();", send_btn)
-                    log_fn(f"  ✅ Sent via button")
-                    send_clicked = True
-                except:
-                    pass
+                    return "button"
                 
-                if not send_clicked:
-                    # Method 2: Find parent button of send icon
-                    try:
-                        send_btn = driver.find_element(By.XPATH, '//button[.//span[@data-icon="send"]]')
-                        driver.execute_script("arguments[0].click();", send_btn)
-                        log_fn(f"  ✅ Sent via button")
-                        send_clicked = True
-                    except:
-                        pass
+                def send_via_icon_button():
+                    # Parent button of send icon
+                    send_btn = driver.find_element(By.XPATH, '//button[.//span[@data-icon="send"]]')
+                    driver.execute_script("arguments[0].click();", send_btn)
+                    return "button"
                 
-                if not send_clicked:
-                    # Method 3: Find any button with send aria-label
-                    try:
-                        send_btn = driver.find_element(By.XPATH, '//button[contains(@aria-label, "Send") or contains(@aria-label, "send")]')
-                        send_btn.click()
-                        log_fn(f"  ✅ Sent via button")
-                        send_clicked = True
-                    except:
-                        pass
+                def send_via_aria_label():
+                    # Any button with send aria-label
+                    send_btn = driver.find_element(By.XPATH, '//button[contains(@aria-label, "Send") or contains(@aria-label, "send")]')
+                    send_btn.click()
+                    return "button"
                 
-                if not send_clicked:
-                    # Method 4: Find button in attachment preview footer
-                    try:
-                        send_btn = driver.find_element(By.XPATH, '//div[contains(@class, "send") or contains(@class, "Send")]//button')
-                        driver.execute_script("arguments[0].click();", send_btn)
-                        log_fn(f"  ✅ Sent via button")
-                        send_clicked = True
-                    except:
-                        pass
+                def send_via_footer_button():
+                    # Button in attachment preview footer
+                    send_btn = driver.find_element(By.XPATH, '//div[contains(@class, "send") or contains(@class, "Send")]//button')
+                    driver.execute_script("arguments[0].click();", send_btn)
+                    return "button"
                 
-                if not send_clicked:
-                    # Method 5: Press Enter in caption box (most reliable for videos)
+                send_methods = {
+                    "send icon": send_via_icon,
+                    "send icon button": send_via_icon_button,
+                    "aria-label": send_via_aria_label,
+                    "preview footer": send_via_footer_button,
+                }
+                _, sent_via = strategies.run("wa-send", list(send_methods), lambda name: send_methods[name]())
+                
+                if sent_via is None:
+                    # Last resort, never cached: Enter goes to the first editable div, which may not be the caption box
                     try:
                         caption_box = driver.find_element(By.XPATH, '//div[@contenteditable="true"]')
                         caption_box.send_keys(Keys.ENTER)
-                        log_fn(f"  ✅ Sent via Enter key")
-                        send_clicked = True
-                    except Exception as e5:
-                        log_fn(f"  ⚠️ All send methods failed: {str(e5)[:80]}")
+                        sent_via = "Enter key"
+                    except Exception as e:
+                        log_fn(f"  ⚠️ All send methods failed: {str(e)[:80]}")
+                send_clicked = sent_via is not None
+                if send_clicked:
+                    log_fn(f"  ✅ Sent via {sent_via}")
                 
                 if not send_clicked:
                     log_fn(f"  ❌ ALL METHODS FAILED - Message not sent!")
-                else:
-                    time.sleep(3)  # Wait for message to send
-                    log_fn(f"✅ WhatsApp message with attachment sent to {phone}")
+                    finish_phases()
+                    return False
+                ticked = wait_for_sent_tick(driver, phases, outgoing_before, log_fn)
+                if media_timed_out and not ticked:
+                    # Not journaled as sent, so a resumed run retries it with the attachment
+                    log_fn(f"  ❌ Attachment to {phone} not confirmed sent after media timeout")
+                    finish_phases()
+                    return False
+                log_fn(f"✅ WhatsApp message with attachment sent to {phone}")
                 
                 # Successfully sent attachment, return now
+                finish_phases()
                 return True
                 
             except Exception as e:
@@ -286,24 +1726,21 @@ def send_message_whatsapp(driver, phone, message, log_fn, stop_event, attachment
                         input_box = wait.until(
                             EC.element_to_be_clickable((By.XPATH, '//div[@contenteditable="true"][@data-tab="10"]'))
                         )
-                        input_box.click()
-                        time.sleep(0.3)
-                        lines = message.split('\n')
-                        for i, line in enumerate(lines):
-                            if line.strip():
-                                input_box.send_keys(line)
-                            if i < len(lines) - 1:
-                                input_box.send_keys(Keys.SHIFT + Keys.ENTER)
-                        time.sleep(0.5)
+                        insert_text(input_box)
+                        outgoing_before = wa_outgoing_count(driver)
                         input_box.send_keys(Keys.ENTER)
+                        wait_for_sent_tick(driver, phases, outgoing_before, log_fn)
                         log_fn(f"✅ WhatsApp text message sent to {phone} (attachment failed)")
+                        finish_phases()
                         return True
                     except Exception as text_err:
                         log_fn(f"  ❌ Text fallback also failed: {text_err}")
+                        finish_phases()
                         return False
                 else:
                     # No message and attachment failed
                     log_fn(f"  ❌ Attachment failed and no text to send")
+                    finish_phases()
                     return False
         
         # No attachment - send text only (if message exists)
@@ -312,23 +1749,17 @@ def send_message_whatsapp(driver, phone, message, log_fn, stop_event, attachment
                 input_box = wait.until(
                     EC.element_to_be_clickable((By.XPATH, '//div[@contenteditable="true"][@data-tab="10"]'))
                 )
-                input_box.click()
-                time.sleep(0.3)
-                
-                # Split message by lines and send with proper formatting
-                lines = message.split('\n')
-                for i, line in enumerate(lines):
-                    if line.strip():  # Only send non-empty lines
-                        input_box.send_keys(line)
-                    # Add line break except for the last line
-                    if i < len(lines) - 1:
-                        input_box.send_keys(Keys.SHIFT + Keys.ENTER)
+                # Whole message in one operation (keystroke typing only as a fallback)
+                insert_text(input_box)
                 
-                time.sleep(0.5)
+                outgoing_before = wa_outgoing_count(driver)
                 input_box.send_keys(Keys.ENTER)
+                wait_for_sent_tick(driver, phases, outgoing_before, log_fn)
                 log_fn(f"✅ WhatsApp message sent to {phone}")
+                finish_phases()
             except Exception as e:
                 log_fn(f"❌ Failed to send text message: {e}")
+                finish_phases()
                 return False
         else:
             # No message and no attachment
@@ -351,12 +1782,299 @@ def send_message_whatsapp(driver, phone, message, log_fn, stop_event, attachment
         
         return True
 
+    except RecipientUnavailableError:
+        raise
     except Exception as e:
         log_fn(f"❌ Failed to send WhatsApp to {phone}: {e}")
         return False
 
+# --- Helper: pick SMTP server for the sender's domain ---
+def get_smtp_server(sender_email):
+    """Return (smtp_server, smtp_port) based on the sender's email domain."""
+    domain = sender_email.split('@')[1].lower()
+    if 'gmail' in domain:
+        return 'smtp.gmail.com', 587
+    elif 'outlook' in domain or 'hotmail' in domain:
+        return 'smtp-mail.outlook.com', 587
+    return 'smtp.gmail.com', 587
+
+# --- SMTP session pool (keeps authenticated connections open across a campaign) ---
+class SMTPSessionPool:
+    """
+    Pool of logged-in SMTP connections for one sender account.
+
+    Connections are reused across emails instead of paying the TCP + STARTTLS +
+    AUTH handshake for every recipient. A connection is retired after
+    `max_messages_per_connection` emails (providers throttle long sessions), and
+    a dropped connection is reopened once and the email retried.
+    """
+
+    def __init__(self, sender_email, sender_password, max_messages_per_connection=SMTP_MAX_MESSAGES_PER_CONNECTION):
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.smtp_server, self.smtp_port = get_smtp_server(sender_email)
+        self.max_messages_per_connection = max(1, max_messages_per_connection)
+        self._idle = []  # [(server, messages_sent_on_connection)]
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.reconnects = 0
+        self.messages_sent = 0
+        self.total_send_time = 0.0
+
+    def _connect(self):
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=SMTP_TIMEOUT)
+        try:
+            server.starttls()
+            server.login(self.sender_email, self.sender_password)
+        except Exception:
+            self._close(server)
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return server
+
+    def _close(self, server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect(), 0
+
+    def _release(self, server, count):
+        if count >= self.max_messages_per_connection:
+            self._close(server)
+            return
+        with self._lock:
+            self._idle.append((server, count))
+
+    def send_message(self, email_to, streamed):
+        """Stream one StreamedMessage on a pooled connection, reconnecting once if it dropped."""
+        server, count = self._acquire()
+        start = time.perf_counter()
+        try:
+            try:
+                stream_sendmail(server, self.sender_email, email_to, streamed)
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+                self._close(server)
+                with self._lock:
+                    self.reconnects += 1
+                server, count = self._connect(), 0
+                stream_sendmail(server, self.sender_email, email_to, streamed)
+        except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+            self._close(server)
+            raise
+        except Exception:
+            # Recipient/data errors leave the session usable
+            self._release(server, count)
+            raise
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.messages_sent += 1
+            self.total_send_time += elapsed
+        self._release(server, count + 1)
+
+    def average_latency_ms(self):
+        with self._lock:
+            if not self.messages_sent:
+                return 0.0
+            return self.total_send_time / self.messages_sent * 1000
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+# --- Rate limiting: token bucket per sender account ---
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/sec refilled up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = max(rate, 0.01)
+        self.capacity = capacity if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop_event=None):
+        """Block until a token is available. Returns False if stop_event is set first."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if stop_event is not None and stop_event.wait(min(wait, 0.5)):
+                return False
+            elif stop_event is None:
+                time.sleep(wait)
+
+_sender_rate_limiters = {}
+_sender_rate_limiters_lock = threading.Lock()
+
+def get_sender_rate_limiter(sender_email, rate):
+    """Return the shared token bucket for a sender account (recreated if the rate changes)."""
+    key = sender_email.strip().lower()
+    with _sender_rate_limiters_lock:
+        bucket = _sender_rate_limiters.get(key)
+        if bucket is None or bucket.rate != max(rate, 0.01):
+            bucket = TokenBucket(rate)
+            _sender_rate_limiters[key] = bucket
+        return bucket
+
+# --- Helper: run tasks on a thread pool with a bounded number in flight ---
+def run_bounded_concurrently(items, task_fn, max_in_flight, stop_event):
+    """
+    Call task_fn(*item) for each item on a thread pool, never submitting more
+    than max_in_flight tasks ahead of completion. Works with lazy iterables.
+    Returns when all submitted tasks are done or stop_event is set.
+    """
+    slots = threading.BoundedSemaphore(max_in_flight)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for item in items:
+            acquired = False
+            while not stop_event.is_set():
+                if slots.acquire(timeout=0.2):
+                    acquired = True
+                    break
+            if not acquired:
+                break
+            executor.submit(task_fn, *item).add_done_callback(lambda _f: slots.release())
+
+# --- Attachment cache: read + base64-encode each file once per campaign ---
+class EncodedAttachment:
+    """A file read and base64-encoded once; every email streams the same encoded bytes."""
+
+    def __init__(self, path):
+        self.path = path
+        self.filename = os.path.basename(path)
+        with open(path, "rb") as f:
+            raw = f.read()
+        self.raw_size = len(raw)
+        # Same line layout as email.encoders.encode_base64, with SMTP line endings.
+        # Base64 lines never start with '.', so no dot-stuffing is needed.
+        self.data = base64.encodebytes(raw).rstrip(b"\n").replace(b"\n", b"\r\n")
+        self.encoded_size = len(self.data)
+
+    def placeholder_part(self):
+        """MIME part whose payload is a marker that StreamedMessage swaps for self.data."""
+        part = MIMEBase("application", "octet-stream")
+        part.set_payload(_ATTACHMENT_PLACEHOLDER)
+        part["Content-Transfer-Encoding"] = "base64"
+        part.add_header("Content-Disposition", f"attachment; filename={self.filename}")
+        return part
+
+    def iter_chunks(self, chunk_size=SMTP_STREAM_CHUNK_SIZE):
+        view = memoryview(self.data)
+        for i in range(0, len(view), chunk_size):
+            yield view[i:i + chunk_size]
+
+_ATTACHMENT_PLACEHOLDER = "@@GROWHIGH-ATTACHMENT-PAYLOAD@@"
+_DOT_STUFF_RE = re.compile(rb'(?m)^\.')
+
+class StreamedMessage:
+    """
+    An email flattened to SMTP wire format without copying the attachment.
+
+    Headers and body are rendered with the email package (CRLF line endings,
+    dot-stuffed); the attachment payload is written from the shared encoded
+    bytes in chunks, so only head + tail are held per message.
+    """
+
+    def __init__(self, msg, attachment=None):
+        buf = io.BytesIO()
+        # mangle_from_=False like msg.as_string()/as_bytes(): body lines starting "From " go out unchanged
+        BytesGenerator(buf, mangle_from_=False, policy=msg.policy.clone(linesep="\r\n")).flatten(msg)
+        flat = buf.getvalue()
+        if not flat.endswith(b"\r\n"):
+            flat += b"\r\n"
+        self.attachment = attachment
+        if attachment is not None:
+            head, tail = flat.split(_ATTACHMENT_PLACEHOLDER.encode("ascii"), 1)
+        else:
+            head, tail = flat, b""
+        self.head = _DOT_STUFF_RE.sub(b"..", head)
+        self.tail = _DOT_STUFF_RE.sub(b"..", tail)
+
+    @property
+    def buffered_size(self):
+        return len(self.head) + len(self.tail)
+
+    def iter_chunks(self):
+        yield self.head
+        if self.attachment is not None:
+            yield from self.attachment.iter_chunks()
+        if self.tail:
+            yield self.tail
+
+def stream_sendmail(server, from_addr, to_addr, streamed):
+    """
+    Like smtplib.SMTP.sendmail, but writes the DATA phase chunk by chunk
+    straight to the socket instead of building one big string.
+    """
+    server.ehlo_or_helo_if_needed()
+    code, resp = server.mail(from_addr)
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPSenderRefused(code, resp, from_addr)
+    code, resp = server.rcpt(to_addr)
+    if code not in (250, 251):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused({to_addr: (code, resp)})
+    code, resp = server.docmd("data")
+    if code != 354:
+        server.rset()
+        raise smtplib.SMTPDataError(code, resp)
+    for chunk in streamed.iter_chunks():
+        server.send(chunk)
+    server.send(b".\r\n")
+    code, resp = server.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, resp)
+
+class AttachmentCache:
+    """Campaign-level cache of encoded attachments plus memory accounting."""
+
+    def __init__(self):
+        self._items = {}
+        self._lock = threading.Lock()
+        self.peak_message_bytes = 0
+
+    def get(self, path):
+        key = os.path.abspath(path)
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                item = EncodedAttachment(path)
+                self._items[key] = item
+            return item
+
+    def note_message_size(self, size):
+        with self._lock:
+            if size > self.peak_message_bytes:
+                self.peak_message_bytes = size
+
+    def summary(self):
+        with self._lock:
+            items = list(self._items.values())
+        raw = sum(item.raw_size for item in items)
+        encoded = sum(item.encoded_size for item in items)
+        return (f"📎 Attachment cache: {len(items)} file(s) encoded once ({raw / 1048576:.1f} MB raw → "
+                f"{encoded / 1048576:.1f} MB base64), peak per-message buffer {self.peak_message_bytes / 1024:.1f} KB")
+
 # --- Email sending via SMTP with attachment support ---
-def send_email_smtp(email_to, subject, body, sender_email, sender_password, log_fn, stop_event, attachment_path=None):
+def send_email_smtp(email_to, subject, body, sender_email, sender_password, log_fn, stop_event, attachment_path=None, smtp_pool=None, delay_seconds=2, attachment_cache=None):
     """
     Send an email via SMTP (Gmail/Outlook) with optional attachment.
     
@@ -369,6 +2087,12 @@ def send_email_smtp(email_to, subject, body, sender_email, sender_password, log_
         log_fn: callable, logging function
         stop_event: threading.Event, used to stop execution gracefully
         attachment_path: str, optional path to file to attach
+        smtp_pool: SMTPSessionPool, optional pool to reuse logged-in connections
+        delay_seconds: int, seconds to wait after sending (0 when rate-limited by caller)
+        attachment_cache: AttachmentCache, optional campaign cache of encoded attachments
+    
+    The message is streamed into the SMTP DATA phase (see StreamedMessage), so
+    the attachment is never copied per recipient.
     
     Returns:
         bool, True if sent successfully, False otherwise
@@ -379,7 +2103,7 @@ def send_email_smtp(email_to, subject, body, sender_email, sender_password, log_
     
     try:
         # Validate email format
-        if not re.match(r'^[^@]+@[^@]+\.[^@]+$', email_to):
+        if not re.match(EMAIL_PATTERN, email_to):
             log_fn(f"❌ Invalid email format: {email_to}")
             return False
         
@@ -393,44 +2117,38 @@ def send_email_smtp(email_to, subject, body, sender_email, sender_password, log_
         msg.attach(MIMEText(body, 'plain'))
         
         # Attach file if provided
+        attachment = None
         if attachment_path and os.path.exists(attachment_path):
             try:
-                with open(attachment_path, "rb") as f:
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(f.read())
-                encoders.encode_base64(part)
-                part.add_header(
-                    "Content-Disposition",
-                    f"attachment; filename={os.path.basename(attachment_path)}",
-                )
-                msg.attach(part)
+                if attachment_cache is not None:
+                    attachment = attachment_cache.get(attachment_path)
+                else:
+                    attachment = EncodedAttachment(attachment_path)
+                msg.attach(attachment.placeholder_part())
                 log_fn(f"  📎 Attached: {os.path.basename(attachment_path)}")
             except Exception as e:
+                attachment = None
                 log_fn(f"  ⚠️ Attachment failed: {e}")
         
-        # Detect SMTP server based on email domain
-        domain = sender_email.split('@')[1].lower()
-        if 'gmail' in domain:
-            smtp_server = 'smtp.gmail.com'
-            smtp_port = 587
-        elif 'outlook' in domain or 'hotmail' in domain:
-            smtp_server = 'smtp-mail.outlook.com'
-            smtp_port = 587
-        else:
-            smtp_server = 'smtp.gmail.com'
-            smtp_port = 587
+        streamed = StreamedMessage(msg, attachment)
+        if attachment_cache is not None:
+            attachment_cache.note_message_size(streamed.buffered_size)
         
-        # Send email
-        server = smtplib.SMTP(smtp_server, smtp_port, timeout=10)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, email_to, msg.as_string())
-        server.quit()
+        # Send email (pooled session if available, otherwise a one-off connection)
+        if smtp_pool is not None:
+            smtp_pool.send_message(email_to, streamed)
+        else:
+            smtp_server, smtp_port = get_smtp_server(sender_email)
+            server = smtplib.SMTP(smtp_server, smtp_port, timeout=SMTP_TIMEOUT)
+            server.starttls()
+            server.login(sender_email, sender_password)
+            stream_sendmail(server, sender_email, email_to, streamed)
+            server.quit()
         
         log_fn(f"✅ Email sent to {email_to}")
         
         # Short delay between emails
-        for remaining in range(2, 0, -1):
+        for remaining in range(delay_seconds, 0, -1):
             if stop_event.is_set():
                 break
             log_fn(f"  ⏳ Waiting {remaining} seconds...")
@@ -503,8 +2221,8 @@ def send_message_sms(device, phone, message, log_fn, stop_event, delay_seconds=5
             log_fn("❌ Empty phone number, skipping.")
             return False
         
-        # Clean phone number (remove spaces, dashes)
-        phone_clean = extract_phone_digits(phone)
+        # Clean phone number (remove spaces, dashes; "+" kept for international numbers)
+        phone_clean = sms_address(phone)
         
         # Check message length
         msg_len = len(message)
@@ -658,8 +2376,52 @@ def send_message_sms(device, phone, message, log_fn, stop_event, delay_seconds=5
         log_fn(f"❌ Failed to send SMS to {phone}: {e}")
         return False
 
+# --- Messenger: one combined probe for the "Continue chatting" prompt ---
+_MESSENGER_CONTINUE_PROBE_JS = """
+const prompts = document.evaluate(
+    "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'continue chatting')]"
+    + " | //div[@role='button' and contains(., 'Continue')]",
+    document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+for (let i = 0; i < prompts.snapshotLength; i++) {
+    const el = prompts.snapshotItem(i);
+    if (el.getClientRects().length && !el.disabled && el.getAttribute('aria-disabled') !== 'true') return ['prompt', el];
+}
+if (document.querySelector('div[role="textbox"][contenteditable="true"]')) return ['absent', null];
+const main = document.querySelector('[role="main"]') || document.body;
+return ['page', main ? main.innerText.slice(0, 5000) : ''];
+"""
+
+# Texts Messenger shows instead of a composer when the username can't be messaged (lowercase, straight quotes)
+MESSENGER_UNAVAILABLE_PATTERNS = (
+    ("content isn't available", "content isn't available"),
+    ("this page isn't available", "page isn't available"),
+    ("you can't message this account", "can't message this account"),
+    ("you can't reply to this conversation", "can't reply to this conversation"),
+    ("this person is unavailable on messenger", "unavailable on Messenger"),
+    ("this person isn't available", "unavailable on Messenger"),
+)
+
+def messenger_unavailable_reason(page_text):
+    """Classify the chat page text: the failure reason if the recipient can't be messaged, else None."""
+    text = page_text.lower().replace("\u2019", "'")
+    for pattern, reason in MESSENGER_UNAVAILABLE_PATTERNS:
+        if pattern in text:
+            return reason
+    return None
+
+def messenger_continue_probe(driver):
+    """Condition: ("prompt", button) if "Continue chatting" is showing, ("absent", None) once the
+    composer rendered without it, ("unavailable", reason) if the chat can't be messaged, False while loading."""
+    result = driver.execute_script(_MESSENGER_CONTINUE_PROBE_JS)
+    if not result:
+        return False
+    if result[0] == "page":
+        reason = messenger_unavailable_reason(result[1] or "")
+        return ("unavailable", reason) if reason else False
+    return result
+
 # --- Messenger sending via Selenium ---
-def send_message_messenger(driver, username, message, log_fn, stop_event, attachment_path=None):
+def send_message_messenger(driver, username, message, log_fn, stop_event, attachment_path=None, strategies=None, phase_stats=None):
     """
     Send a Facebook Messenger message to a single username with optional attachment.
     
@@ -670,71 +2432,66 @@ def send_message_messenger(driver, username, message, log_fn, stop_event, attach
         log_fn: callable, logging function
         stop_event: threading.Event, used to stop execution gracefully
         attachment_path: str, optional path to file to attach
+        strategies: StrategyCache, optional session cache of which message box selector worked
+        phase_stats: PhaseStats, optional run-wide accumulator for the continue-prompt probe time
     
     Returns:
         bool, True if sent successfully, False otherwise
+    
+    Raises:
+        RecipientUnavailableError: the chat shows "content isn't available" or a similar can't-message page
     """
     if stop_event.is_set():
         log_fn("Stopped before sending.")
         return False
+    strategies = strategies or StrategyCache()
     
     try:
         wait = WebDriverWait(driver, WAIT_TIMEOUT)
         short_wait = WebDriverWait(driver, FAST_WAIT)
         actions = ActionChains(driver)
         
-        # Navigate to chat
-        driver.get(f"https://www.messenger.com/t/{username}")
+        # Navigate to chat (in-app via the sidebar link when there is one, else a full page load)
+        phases = {}
+        open_chat(driver, f"https://www.messenger.com/t/{username}", username, _MESSENGER_SPA_OPEN_JS,
+                  _MESSENGER_SPA_SETTLED_JS, strategies, "messenger-navigate", phases, log_fn)
         
-        # Wait for page to load
+        # One probe polled until the chat loads: "Continue chatting" prompt, composer, or an unavailable page.
+        # It returns as soon as one shows up, so slow pages get the full WAIT_TIMEOUT at no cost to fast ones.
         try:
-            short_wait.until(EC.presence_of_element_located((By.XPATH, "//h1 | //h2 | //div[contains(@class, 'x1lliihq')]")))
+            state, btn = timed_wait(driver, phases, "continue probe", messenger_continue_probe, WAIT_TIMEOUT)
         except Exception:
-            pass
-        
-        # Try clicking "Continue chatting" button if present
-        fast_sels = [
-            "//button[.//span[normalize-space()='Continue chatting']]",
-            "//button[normalize-space()='Continue chatting']",
-            "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'continue chatting')]"
-        ]
-        clicked = False
-        for sel in fast_sels:
-            if stop_event.is_set():
-                return False
+            state, btn = "timeout", None
+        if state == "unavailable":
+            if phase_stats is not None:
+                phase_stats.add(phases)
+            raise RecipientUnavailableError(username, btn)
+        if state == "prompt":
             try:
-                btn = short_wait.until(EC.element_to_be_clickable((By.XPATH, sel)))
                 driver.execute_script("arguments[0].scrollIntoView({block:'center'});", btn)
-                time.sleep(0.05)
                 actions.move_to_element(btn).click().perform()
-                clicked = True
-                break
+                time.sleep(POST_CLICK_WAIT)
             except Exception:
-                continue
-        
-        if not clicked:
-            try:
-                fb = short_wait.until(EC.element_to_be_clickable((By.XPATH, "//div[@role='button' and contains(., 'Continue')]")))
-                actions.move_to_element(fb).click().perform()
-            except Exception:
-                pass
-        
-        time.sleep(POST_CLICK_WAIT)
+                state = "click failed"
+        log_fn(f"  ⏱️ Continue prompt: {state} ({phases['continue probe'] * 1000:.0f} ms)")
+        if phase_stats is not None:
+            phase_stats.add(phases)
+        if stop_event.is_set():
+            return False
         
         # Find message box
         msg_sels = [
-            "//div[@role='textbox' and @contenteditable='true']",
-            "//div[@aria-label='Message' and @role='textbox']"
+            "//div[@role='textbox' and @contenteditable='true' and not(@data-automator-prev)]",
+            "//div[@aria-label='Message' and @role='textbox' and not(@data-automator-prev)]"
         ]
-        msg_box = None
-        for sel in msg_sels:
-            if stop_event.is_set():
-                return False
-            try:
-                msg_box = short_wait.until(EC.element_to_be_clickable((By.XPATH, sel)))
-                break
-            except Exception:
-                continue
+        if state == "timeout":
+            # The probe already waited WAIT_TIMEOUT for a composer; only take one that's there now
+            msg_box = next((el for sel in msg_sels for el in driver.find_elements(By.XPATH, sel)
+                            if el.is_displayed()), None)
+        else:
+            _, msg_box = strategies.run(
+                "messenger-composer", msg_sels,
+                lambda sel: short_wait.until(EC.element_to_be_clickable((By.XPATH, sel))))
         
         if not msg_box:
             log_fn(f"  ❌ No message box for {username}")
@@ -754,18 +2511,11 @@ def send_message_messenger(driver, username, message, log_fn, stop_event, attach
             pass
         
         # Send message with proper line break handling (like WhatsApp)
-        try:
-            msg_box.click()
-            time.sleep(0.3)
-            
-            # Split message by lines and send with proper formatting
-            lines = message.split('\n')
-            for i, line in enumerate(lines):
-                if line.strip():  # Only send non-empty lines
-                    msg_box.send_keys(line)
-                # Add line break except for the last line
-                if i < len(lines) - 1:
-                    msg_box.send_keys(Keys.SHIFT + Keys.ENTER)
+        try:
+            # Whole message in one operation (keystroke typing only as a fallback)
+            method = insert_message_text(driver, msg_box, message)
+            if method == "keys":
+                log_fn(f"  ⌨️ Bulk insert unavailable, typed message key by key")
             
             time.sleep(0.5)
             msg_box.send_keys(Keys.ENTER)
@@ -775,11 +2525,14 @@ def send_message_messenger(driver, username, message, log_fn, stop_event, attach
             log_fn(f"  ❌ Send failed {username}: {e}")
             return False
     
+    except RecipientUnavailableError:
+        raise
     except Exception as e:
         log_fn(f"❌ Failed to send Messenger message to {username}: {e}")
         return False
 
 # --- Global UI Components Storage ---
+# (app_helpers.py loads everything above this line for the check scripts)
 attachment_entry = None
 email_config_section = None
 sms_config_section = None
@@ -996,6 +2749,15 @@ def open_csv_compare_tool():
     tk.Label(compare_info, text="Find unique contacts and save to file", font=("Consolas", 8),
              bg=CARD_BG, fg=FG_SECONDARY).pack(side=tk.LEFT, padx=(10, 0))
     
+    low_memory_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(
+        compare_section, text="  💽 Low-memory mode (for files larger than RAM)",
+        variable=low_memory_var,
+        bg=CARD_BG, fg=FG_PRIMARY, selectcolor=BG_SECONDARY,
+        activebackground=HOVER_BG, activeforeground=ACCENT_GREEN,
+        font=("Consolas", 9), highlightthickness=0
+    ).pack(anchor=tk.W, padx=20, pady=(0, 8))
+    
     compare_btn_frame = tk.Frame(compare_section, bg=CARD_BG)
     compare_btn_frame.pack(fill=tk.X, padx=20, pady=(0, 12))
     
@@ -1007,6 +2769,8 @@ def open_csv_compare_tool():
     res_header.pack(fill=tk.X, padx=20, pady=(12, 5))
     tk.Label(res_header, text="📊", font=("Arial", 14), bg=CARD_BG, fg=ACCENT_GREEN).pack(side=tk.LEFT, padx=(0, 10))
     tk.Label(res_header, text="Comparison Results", font=("Consolas", 10, "bold"), bg=CARD_BG, fg=FG_PRIMARY).pack(side=tk.LEFT)
+    progress_label = tk.Label(res_header, text="", font=("Consolas", 8), bg=CARD_BG, fg=ACCENT_YELLOW)
+    progress_label.pack(side=tk.RIGHT)
     
     results_text = scrolledtext.ScrolledText(results_section, height=10, font=("Consolas", 9), bg=BG_SECONDARY, fg=ACCENT_GREEN,
                                             state=tk.DISABLED, relief=tk.FLAT, bd=0, insertbackground=ACCENT_GREEN, padx=12, pady=10)
@@ -1037,176 +2801,301 @@ def open_csv_compare_tool():
     # Global variable to store comparison result
     comparison_result = {'df_unique': None, 'unique_count': 0}
     
-    # Compare function (Step 1)
-    def compare_files():
-        file_a = file_a_entry.get().strip()
-        file_b = file_b_entry.get().strip()
-        
-        if not file_a or not os.path.exists(file_a):
-            messagebox.showerror("Error", "Please select Original CSV (File A)")
-            return
-        
-        if not file_b or not os.path.exists(file_b):
-            messagebox.showerror("Error", "Please select New CSV (File B)")
-            return
-        
+    # Compare runs on a background thread; it only talks to Tk through this queue
+    compare_events = queue.Queue()
+    compare_cancel = threading.Event()
+    compare_state = {'running': False}
+    
+    def post(kind, *payload):
+        compare_events.put((kind,) + payload)
+    
+    def post_log(msg):
+        post("log", msg)
+    
+    def check_cancel():
+        if compare_cancel.is_set():
+            raise CompareCancelled()
+    
+    def report_progress(phase, bytes_done, bytes_total, rows_done):
+        check_cancel()
+        post("progress", f"{phase}: {bytes_done / 1048576:.1f} / {bytes_total / 1048576:.1f} MB ({rows_done} rows)")
+    
+    def run_compare(file_a, file_b, low_memory, country_code):
+        """Step 1 on the compare thread: read, normalize and anti-join, then hand save_unique back to Tk."""
         try:
-            results_text.configure(state=tk.NORMAL)
-            results_text.delete(1.0, tk.END)
-            results_text.configure(state=tk.DISABLED)
-            
-            log_result("═" * 60)
-            log_result("🔄 STARTING CSV COMPARISON...")
-            log_result("═" * 60)
-            log_result("")
-            
-            # Read both CSV files
-            df_a = pd.read_csv(file_a)
-            df_b = pd.read_csv(file_b)
-            
-            log_result(f"✅ File A loaded: {len(df_a)} rows")
-            log_result(f"✅ File B loaded: {len(df_b)} rows")
-            log_result("")
-            
-            # Detect platform based on columns
-            platform_detected = None
-            contact_col = None
-            
-            if 'phone' in df_a.columns or 'Phone' in df_a.columns:
-                platform_detected = "WhatsApp/SMS"
-                contact_col = 'phone' if 'phone' in df_a.columns else 'Phone'
-            elif 'email' in df_a.columns or 'Email' in df_a.columns:
-                platform_detected = "Email"
-                contact_col = 'email' if 'email' in df_a.columns else 'Email'
-            elif 'username' in df_a.columns or 'Username' in df_a.columns:
-                platform_detected = "Messenger"
-                contact_col = 'username' if 'username' in df_a.columns else 'Username'
-            else:
-                # Use first column as contact column
-                contact_col = df_a.columns[0]
-                platform_detected = "Unknown"
-                log_result(f"⚠️ No standard column found, using: '{contact_col}'")
-            
-            log_result(f"📱 Platform detected: {platform_detected}")
-            log_result(f"📋 Using column: '{contact_col}'")
-            log_result("")
-            
-            # Extract and normalize contacts from File A
-            if platform_detected == "WhatsApp/SMS":
-                contacts_a = set(df_a[contact_col].astype(str).apply(extract_phone_digits))
+            if low_memory:
+                # Out-of-core: hash-partition both files on disk, compare bucket by bucket
+                platform_detected, contact_col = detect_compare_column(pd.read_csv(file_a, nrows=0).columns)
+                if platform_detected == "Unknown":
+                    post_log(f"⚠️ No standard column found, using: '{contact_col}'")
+                post_log(f"📱 Platform detected: {platform_detected}")
+                post_log(f"📋 Using column: '{contact_col}'")
+                post_log(f"💽 Low-memory mode: {COMPARE_BUCKETS} on-disk buckets")
+                post_log("")
+                
+                match_start = time.perf_counter()
+                with tempfile.TemporaryDirectory(prefix="growhigh_compare_") as work_dir:
+                    keep, rows_a, rows_b, contacts_a_count, unique_count, duplicate_count = compare_csv_external(
+                        file_a, file_b, contact_col, platform_detected == "WhatsApp/SMS", work_dir, report_progress,
+                        country_code=country_code)
+                match_ms = (time.perf_counter() - match_start) * 1000
+                
+                post_log(f"✅ File A streamed: {rows_a} rows")
+                post_log(f"✅ File B streamed: {rows_b} rows")
+                post_log(f"🔍 Unique contacts in File A: {contacts_a_count}")
+                post_log(f"🔄 Contacts in File B: {rows_b}")
+                post_log(f"✅ Unique contacts (NOT in File A): {unique_count}")
+                post_log(f"♻️  Duplicates (already in File A): {duplicate_count}")
+                post_log(f"⏱️ Partition + compare {match_ms:.0f} ms")
+                post_log("")
+                
+                def save_unique(output_file):
+                    write_rows_by_mask(file_b, keep, output_file, report_progress)
             else:
-                contacts_a = set(df_a[contact_col].astype(str).str.strip().str.lower())
-            
-            contacts_a = {c for c in contacts_a if c and c != 'nan'}
-            log_result(f"🔍 Unique contacts in File A: {len(contacts_a)}")
-            
-            # Find unique contacts in File B (not in File A)
-            unique_rows = []
-            duplicate_count = 0
-            
-            for idx, row in df_b.iterrows():
-                contact = str(row[contact_col])
+                # Read both CSV files (as text, so rows are written back unchanged)
+                compare_start = time.perf_counter()
+                df_a = read_csv_in_chunks(file_a, "Reading File A", report_progress)
+                post_log(f"✅ File A loaded: {len(df_a)} rows")
+                df_b = read_csv_in_chunks(file_b, "Reading File B", report_progress)
+                post_log(f"✅ File B loaded: {len(df_b)} rows")
+                read_ms = (time.perf_counter() - compare_start) * 1000
+                post_log("")
                 
-                if platform_detected == "WhatsApp/SMS":
-                    normalized = extract_phone_digits(contact)
-                else:
-                    normalized = contact.strip().lower()
+                # Detect platform based on columns
+                platform_detected, contact_col = detect_compare_column(df_a.columns)
+                if platform_detected == "Unknown":
+                    post_log(f"⚠️ No standard column found, using: '{contact_col}'")
                 
-                if normalized and normalized != 'nan':
-                    if normalized not in contacts_a:
-                        unique_rows.append(row)
-                    else:
-                        duplicate_count += 1
-            
-            log_result(f"🔄 Contacts in File B: {len(df_b)}")
-            log_result(f"✅ Unique contacts (NOT in File A): {len(unique_rows)}")
-            log_result(f"♻️  Duplicates (already in File A): {duplicate_count}")
-            log_result("")
-            
-            if not unique_rows:
-                log_result("⚠️  NO UNIQUE CONTACTS FOUND!")
-                log_result("All contacts in File B already exist in File A.")
-                log_result("")
-                messagebox.showinfo("No Unique Contacts", "❌ No unique contacts found!\n\nAll contacts in File B already exist in File A.")
-                return
-            
-            # Ask user where to save
-            output_file = filedialog.asksaveasfilename(
-                parent=compare_window,
-                title="Save Unique Contacts",
-                defaultextension=".csv",
-                initialfile="unique_contacts.csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
-            )
-            
-            if not output_file:
-                log_result("⚠️ Save cancelled by user")
-                return
-            
-            # Create new DataFrame with unique contacts
-            df_unique = pd.DataFrame(unique_rows)
+                post_log(f"📱 Platform detected: {platform_detected}")
+                post_log(f"📋 Using column: '{contact_col}'")
+                post_log("")
+                
+                # Normalize both columns and anti-join File B against File A
+                post("progress", f"Matching {len(df_b)} rows against File A...")
+                match_start = time.perf_counter()
+                df_unique, contacts_a_count, duplicate_count = compare_contacts(df_a, df_b, contact_col, platform_detected == "WhatsApp/SMS", country_code)
+                unique_count = len(df_unique)
+                match_ms = (time.perf_counter() - match_start) * 1000
+                check_cancel()
+                post("progress", f"Matched {len(df_b)} rows: {unique_count} unique")
+                post_log(f"🔍 Unique contacts in File A: {contacts_a_count}")
+                
+                post_log(f"🔄 Contacts in File B: {len(df_b)}")
+                post_log(f"✅ Unique contacts (NOT in File A): {unique_count}")
+                post_log(f"♻️  Duplicates (already in File A): {duplicate_count}")
+                post_log(f"⏱️ Read {read_ms:.0f} ms | Compare {match_ms:.0f} ms")
+                post_log("")
+                
+                def save_unique(output_file):
+                    for start in range(0, max(unique_count, 1), COMPARE_CHUNK_SIZE):
+                        check_cancel()
+                        df_unique.iloc[start:start + COMPARE_CHUNK_SIZE].to_csv(
+                            output_file, index=False, header=start == 0, mode="w" if start == 0 else "a")
+                        post("progress", f"Writing unique rows: {min(start + COMPARE_CHUNK_SIZE, unique_count)} / {unique_count}")
             
-            log_result(f"💾 Saving {len(unique_rows)} contacts to file...")
+            post("compared", unique_count, save_unique)
+        except CompareCancelled:
+            post("cancelled")
+        except Exception as e:
+            post("error", e)
+    
+    def run_save(save_unique, output_file, unique_count):
+        """Step 2 on the compare thread: write the unique rows to output_file."""
+        try:
+            post_log(f"💾 Saving {unique_count} contacts to file...")
             
             # Ensure output directory exists
             output_dir = os.path.dirname(output_file)
             if output_dir and not os.path.exists(output_dir):
                 os.makedirs(output_dir, exist_ok=True)
-                log_result(f"📁 Created directory: {output_dir}")
+                post_log(f"📁 Created directory: {output_dir}")
             
             # Save to output file
-            df_unique.to_csv(output_file, index=False)
+            write_start = time.perf_counter()
+            try:
+                save_unique(output_file)
+            except CompareCancelled:
+                if os.path.exists(output_file):
+                    os.remove(output_file)  # Don't leave a half-written CSV behind
+                raise
             
             # Verify file was saved
             if os.path.exists(output_file):
                 file_size = os.path.getsize(output_file)
-                log_result(f"✅ File saved successfully! ({file_size} bytes)")
+                post_log(f"✅ File saved successfully! ({file_size} bytes in {(time.perf_counter() - write_start) * 1000:.0f} ms)")
             else:
-                log_result(f"⚠️ Warning: File save reported success but file not found")
-            
-            log_result("")
-            log_result("═" * 60)
-            log_result("✅ SUCCESS!")
-            log_result("═" * 60)
-            log_result(f"📊 Found {len(unique_rows)} unique contacts")
-            log_result(f"💾 Saved to: {output_file}")
-            log_result("")
-            log_result("✨ File is ready to use in the main app!")
-            log_result("═" * 60)
-            
-            # Auto-load the new file into main CSV entry (if it exists)
-            try:
-                csv_entry.delete(0, tk.END)
-                csv_entry.insert(0, output_file)
-                log(f"✅ Loaded unique contacts CSV: {output_file}")
-            except:
-                pass  # csv_entry or log() not yet defined
-            
-            # Ask if user wants to open the folder
-            response = messagebox.askyesno("✅ Success!", 
-                              f"Found {len(unique_rows)} unique contacts!\n\n" +
-                              f"💾 Saved to:\n{output_file}\n\n" +
-                              f"📤 File has been auto-loaded in the main app.\n\n" +
-                              f"Do you want to open the folder?")
-            
-            if response:
-                # Open folder containing the file
-                import subprocess
-                folder_path = os.path.dirname(output_file)
-                subprocess.Popen(f'explorer /select,"{output_file}"')
-            
+                post_log(f"⚠️ Warning: File save reported success but file not found")
+            post("saved", output_file, unique_count)
+        except CompareCancelled:
+            post("cancelled")
         except Exception as e:
+            post("error", e)
+    
+    def start_compare_thread(target, *args):
+        compare_state['running'] = True
+        threading.Thread(target=target, args=args, daemon=True).start()
+    
+    def finish_compare():
+        compare_state['running'] = False
+        progress_label.config(text="")
+        cancel_btn.pack_forget()
+        compare_btn.config(state=tk.NORMAL)
+    
+    def on_compared(unique_count, save_unique):
+        if not unique_count:
+            finish_compare()
+            log_result("⚠️  NO UNIQUE CONTACTS FOUND!")
+            log_result("All contacts in File B already exist in File A.")
             log_result("")
-            log_result(f"❌ ERROR: {str(e)}")
-            log_result(f"Full error: {repr(e)}")
-            log_result("")
-            messagebox.showerror("Error", f"Failed to compare CSV files:\n\n{str(e)}")
+            messagebox.showinfo("No Unique Contacts", "❌ No unique contacts found!\n\nAll contacts in File B already exist in File A.")
+            return
+        
+        # Ask user where to save (dialogs stay on the Tk thread)
+        output_file = filedialog.asksaveasfilename(
+            parent=compare_window,
+            title="Save Unique Contacts",
+            defaultextension=".csv",
+            initialfile="unique_contacts.csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        
+        if not output_file:
+            finish_compare()
+            log_result("⚠️ Save cancelled by user")
+            return
+        
+        start_compare_thread(run_save, save_unique, output_file, unique_count)
+    
+    def on_saved(output_file, unique_count):
+        finish_compare()
+        log_result("")
+        log_result("═" * 60)
+        log_result("✅ SUCCESS!")
+        log_result("═" * 60)
+        log_result(f"📊 Found {unique_count} unique contacts")
+        log_result(f"💾 Saved to: {output_file}")
+        log_result("")
+        log_result("✨ File is ready to use in the main app!")
+        log_result("═" * 60)
+        
+        # Auto-load the new file into main CSV entry (if it exists)
+        try:
+            csv_entry.delete(0, tk.END)
+            csv_entry.insert(0, output_file)
+            log(f"✅ Loaded unique contacts CSV: {output_file}")
+        except:
+            pass  # csv_entry or log() not yet defined
+        
+        # Ask if user wants to open the folder
+        response = messagebox.askyesno("✅ Success!", 
+                          f"Found {unique_count} unique contacts!\n\n" +
+                          f"💾 Saved to:\n{output_file}\n\n" +
+                          f"📤 File has been auto-loaded in the main app.\n\n" +
+                          f"Do you want to open the folder?")
+        
+        if response:
+            # Open folder containing the file
+            import subprocess
+            folder_path = os.path.dirname(output_file)
+            subprocess.Popen(f'explorer /select,"{output_file}"')
+    
+    def on_error(e):
+        finish_compare()
+        log_result("")
+        log_result(f"❌ ERROR: {str(e)}")
+        log_result(f"Full error: {repr(e)}")
+        log_result("")
+        messagebox.showerror("Error", f"Failed to compare CSV files:\n\n{str(e)}")
+    
+    def poll_compare_events():
+        """Drain compare events every ~16 ms (60 fps); only the latest progress text is drawn."""
+        if not compare_window.winfo_exists():
+            return
+        latest_progress = None
+        finished = None
+        while finished is None:
+            try:
+                kind, *payload = compare_events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "log":
+                log_result(payload[0])
+            elif kind == "progress":
+                latest_progress = payload[0]
+            else:
+                finished = (kind, payload)
+        if latest_progress is not None:
+            progress_label.config(text=latest_progress)
+        
+        if finished:
+            compare_state['running'] = False
+            kind, payload = finished
+            if kind == "compared":
+                on_compared(*payload)
+            elif kind == "saved":
+                on_saved(*payload)
+            elif kind == "cancelled":
+                finish_compare()
+                log_result("⏹️ Comparison cancelled")
+            elif kind == "error":
+                on_error(*payload)
+        if compare_state['running'] or not compare_events.empty():
+            compare_window.after(16, poll_compare_events)
+    
+    # Compare function (Step 1)
+    def compare_files():
+        file_a = file_a_entry.get().strip()
+        file_b = file_b_entry.get().strip()
+        
+        if not file_a or not os.path.exists(file_a):
+            messagebox.showerror("Error", "Please select Original CSV (File A)")
+            return
+        
+        if not file_b or not os.path.exists(file_b):
+            messagebox.showerror("Error", "Please select New CSV (File B)")
+            return
+        
+        if compare_state['running']:
+            return
+        
+        results_text.configure(state=tk.NORMAL)
+        results_text.delete(1.0, tk.END)
+        results_text.configure(state=tk.DISABLED)
+        
+        log_result("═" * 60)
+        log_result("🔄 STARTING CSV COMPARISON...")
+        log_result("═" * 60)
+        log_result("")
+        
+        compare_cancel.clear()
+        compare_btn.config(state=tk.DISABLED)
+        cancel_btn.pack(fill=tk.X, pady=(8, 0))
+        try:
+            country_code = clean_country_code(country_code_entry.get())
+        except NameError:
+            country_code = ""  # Main window's settings not built yet
+        start_compare_thread(run_compare, file_a, file_b, low_memory_var.get(), country_code)
+        poll_compare_events()
+    
+    def cancel_compare():
+        compare_cancel.set()
+        progress_label.config(text="Cancelling...")
+    
+    def on_compare_window_close():
+        compare_cancel.set()
+        compare_window.destroy()
+    
+    compare_window.protocol("WM_DELETE_WINDOW", on_compare_window_close)
     
     compare_btn = tk.Button(compare_btn_frame, text="🔄  COMPARE & SAVE", command=compare_files, 
                            bg=ACCENT_MAIN, fg="white", font=("Consolas", 11, "bold"), 
                            relief=tk.FLAT, bd=0, padx=30, pady=14, cursor="hand2")
     compare_btn.pack(fill=tk.X)
     
+    cancel_btn = tk.Button(compare_btn_frame, text="⏹️  CANCEL", command=cancel_compare,
+                           bg=ACCENT_RED, fg="white", font=("Consolas", 10, "bold"),
+                           relief=tk.FLAT, bd=0, padx=30, pady=8, cursor="hand2")
+    
     def on_compare_btn_enter(event):
         compare_btn.config(bg="#4A8DD6")
     
@@ -1303,6 +3192,8 @@ def on_platform_change(*args):
     selected = platform_var.get()
     log(f"📱 Platform switched to: {selected}")
     update_ui_for_platform()
+    if prewarm_var.get():
+        browser_prewarmer.start(selected, log)
 
 platform_var.trace('w', on_platform_change)
 
@@ -1342,7 +3233,21 @@ email_password_entry.pack(fill=tk.X, ipady=6, pady=(0, 10))
 
 tk.Label(email_input_frame, text="Email Subject:", font=FONT_TEXT, bg=CARD_BG, fg=FG_PRIMARY).pack(anchor=tk.W, pady=(0, 3))
 email_subject_entry = tk.Entry(email_input_frame, bg=HOVER_BG, fg=FG_PRIMARY, font=FONT_TEXT, relief=tk.FLAT, bd=0, insertbackground=ACCENT_GREEN)
-email_subject_entry.pack(fill=tk.X, ipady=6, pady=(0, 15))
+email_subject_entry.pack(fill=tk.X, ipady=6, pady=(0, 10))
+
+email_speed_frame = tk.Frame(email_input_frame, bg=CARD_BG)
+email_speed_frame.pack(fill=tk.X, pady=(0, 15))
+
+tk.Label(email_speed_frame, text="Parallel emails:", font=FONT_TEXT, bg=CARD_BG, fg=FG_PRIMARY).pack(side=tk.LEFT, padx=(0, 5))
+email_parallel_entry = tk.Entry(email_speed_frame, bg=HOVER_BG, fg=FG_PRIMARY, font=FONT_TEXT, relief=tk.FLAT, bd=0, insertbackground=ACCENT_GREEN, width=6)
+email_parallel_entry.insert(0, str(EMAIL_MAX_IN_FLIGHT))
+email_parallel_entry.pack(side=tk.LEFT, ipady=5, padx=(0, 15))
+
+tk.Label(email_speed_frame, text="Max emails/sec:", font=FONT_TEXT, bg=CARD_BG, fg=FG_PRIMARY).pack(side=tk.LEFT, padx=(0, 5))
+email_rate_entry = tk.Entry(email_speed_frame, bg=HOVER_BG, fg=FG_PRIMARY, font=FONT_TEXT, relief=tk.FLAT, bd=0, insertbackground=ACCENT_GREEN, width=6)
+email_rate_entry.insert(0, str(EMAIL_RATE_PER_SECOND))
+email_rate_entry.pack(side=tk.LEFT, ipady=5)
+tk.Label(email_speed_frame, text="(1 = send one at a time)", font=("Consolas", 8), bg=CARD_BG, fg=FG_SECONDARY).pack(side=tk.LEFT, padx=(10, 0))
 
 # ===== SECTION 0.6: SMS CONFIGURATION (Hidden by default) =====
 sms_config_section = tk.Frame(content_frame, bg=CARD_BG, relief=tk.FLAT, bd=1, highlightbackground=CARD_BORDER, highlightthickness=1)
@@ -1412,13 +3317,20 @@ messenger_input_frame.pack(fill=tk.X, padx=20, pady=(10, 5))
 def test_messenger_login():
     """Test Messenger login by opening browser"""
     log("📱 Opening Messenger for login test...")
-    try:
-        driver = create_driver()
-        driver.get("https://www.messenger.com")
-        log("✅ Browser opened. Please log in to Facebook Messenger.")
-        log("💡 Keep browser open for sending messages.")
-    except Exception as e:
-        log(f"❌ Failed to open browser: {e}")
+    
+    def open_browser():
+        try:
+            # Reuse the pre-launched browser (the profile can't be opened twice); START picks it up again
+            driver = browser_prewarmer.take() or create_driver()
+            driver.get(PLATFORM_HOME_URLS["Messenger"])
+            browser_prewarmer.keep(driver)
+            log("✅ Browser opened. Please log in to Facebook Messenger.")
+            log("💡 Keep browser open for sending messages.")
+        except Exception as e:
+            log(f"❌ Failed to open browser: {e}")
+    
+    # take() may wait on a launch that logs through root.after, so keep it off the Tk thread
+    threading.Thread(target=open_browser, daemon=True).start()
 
 test_messenger_btn = tk.Button(messenger_input_frame, text="🔐 TEST MESSENGER LOGIN", command=test_messenger_login, 
                            bg=ACCENT_MAIN, fg="#FFFFFF", font=("Consolas", 9, "bold"), 
@@ -1471,6 +3383,8 @@ csv_entry.bind("<FocusIn>", on_csv_focus_in)
 csv_entry.bind("<FocusOut>", on_csv_focus_out)
 
 def browse_csv():
+    if prewarm_var.get():
+        browser_prewarmer.start(platform_var.get(), log)  # Chrome starts while the file dialog is open
     path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
     if path:
         csv_entry.delete(0, tk.END)
@@ -1584,7 +3498,60 @@ skip_01_check = tk.Checkbutton(
     activebackground=HOVER_BG, activeforeground=ACCENT_GREEN,
     font=FONT_TEXT, highlightthickness=0
 )
-skip_01_check.pack(anchor=tk.W, pady=(0, 15))
+skip_01_check.pack(anchor=tk.W, pady=(0, 5))
+
+# Default country code for national-format numbers
+country_frame = tk.Frame(adv_content, bg=CARD_BG)
+country_frame.pack(fill=tk.X, pady=(0, 5))
+
+tk.Label(country_frame, text="Default country code:", font=FONT_TEXT, bg=CARD_BG, fg=FG_PRIMARY).pack(side=tk.LEFT, padx=(0, 10))
+country_code_entry = tk.Entry(country_frame, bg=HOVER_BG, fg=FG_PRIMARY, font=FONT_TEXT, relief=tk.FLAT, bd=0, insertbackground=ACCENT_GREEN, width=8)
+country_code_entry.pack(side=tk.LEFT, ipady=5)
+tk.Label(country_frame, text="(e.g. 977 - added to numbers like 98XXXXXXXX or 0XXXXXXXXX; blank = use as typed)", font=("Consolas", 8), bg=CARD_BG, fg=FG_SECONDARY).pack(side=tk.LEFT, padx=(10, 0))
+
+# Suppression list checkbox
+skip_contacted_var = tk.BooleanVar(value=True)
+skip_contacted_check = tk.Checkbutton(
+    adv_content, text="  Skip contacts already messaged in earlier campaigns",
+    variable=skip_contacted_var,
+    bg=CARD_BG, fg=FG_PRIMARY, selectcolor=BG_SECONDARY,
+    activebackground=HOVER_BG, activeforeground=ACCENT_GREEN,
+    font=FONT_TEXT, highlightthickness=0
+)
+skip_contacted_check.pack(anchor=tk.W, pady=(0, 5))
+
+# Resume checkbox
+resume_var = tk.BooleanVar(value=False)
+resume_check = tk.Checkbutton(
+    adv_content, text="  Resume last run of this CSV (skip rows already sent)",
+    variable=resume_var,
+    bg=CARD_BG, fg=FG_PRIMARY, selectcolor=BG_SECONDARY,
+    activebackground=HOVER_BG, activeforeground=ACCENT_GREEN,
+    font=FONT_TEXT, highlightthickness=0
+)
+resume_check.pack(anchor=tk.W, pady=(0, 5))
+
+# Dedup checkbox
+dedup_var = tk.BooleanVar(value=True)
+dedup_check = tk.Checkbutton(
+    adv_content, text="  Send only once to duplicate phones/emails in the CSV",
+    variable=dedup_var,
+    bg=CARD_BG, fg=FG_PRIMARY, selectcolor=BG_SECONDARY,
+    activebackground=HOVER_BG, activeforeground=ACCENT_GREEN,
+    font=FONT_TEXT, highlightthickness=0
+)
+dedup_check.pack(anchor=tk.W, pady=(0, 5))
+
+# Browser pre-launch checkbox
+prewarm_var = tk.BooleanVar(value=True)
+prewarm_check = tk.Checkbutton(
+    adv_content, text="  Pre-launch the browser while choosing the CSV (WhatsApp/Messenger)",
+    variable=prewarm_var,
+    bg=CARD_BG, fg=FG_PRIMARY, selectcolor=BG_SECONDARY,
+    activebackground=HOVER_BG, activeforeground=ACCENT_GREEN,
+    font=FONT_TEXT, highlightthickness=0
+)
+prewarm_check.pack(anchor=tk.W, pady=(0, 15))
 
 # Delay time configuration
 delay_frame = tk.Frame(adv_content, bg=CARD_BG)
@@ -1623,7 +3590,7 @@ s2_header = tk.Frame(section2, bg=CARD_BG)
 s2_header.pack(fill=tk.X, padx=20, pady=(15, 5))
 tk.Label(s2_header, text="💬", font=("Arial", 18), bg=CARD_BG, fg=ACCENT_GREEN).pack(side=tk.LEFT, padx=(0, 10))
 tk.Label(s2_header, text="Compose Your Message", font=FONT_LABEL, bg=CARD_BG, fg=FG_PRIMARY).pack(side=tk.LEFT)
-tk.Label(s2_header, text="Type your message here (use \\n for line breaks)", font=("Consolas", 8), bg=CARD_BG, fg=FG_SECONDARY).pack(anchor=tk.W, pady=(5, 0))
+tk.Label(s2_header, text="Type your message here (use \\n for line breaks, {column} or {column|default} for CSV fields)", font=("Consolas", 8), bg=CARD_BG, fg=FG_SECONDARY).pack(anchor=tk.W, pady=(5, 0))
 
 msg_text = tk.Text(section2, height=10, width=80, wrap=tk.WORD, bg=HOVER_BG, fg=FG_PRIMARY, font=FONT_TEXT, 
                    relief=tk.FLAT, bd=0, insertbackground=ACCENT_GREEN, padx=12, pady=10)
@@ -1751,10 +3718,15 @@ def start_sending():
         
         # Get platform and attachment
         platform = platform_var.get()
+        browser_prewarmer.start(platform, log)  # Overlap Chrome start-up with CSV preparation
         attachment_path = attachment_entry.get().strip() if attachment_entry.get().strip() else None
         
         # Get advanced settings
         skip_01_numbers = skip_01_var.get()
+        country_code = clean_country_code(country_code_entry.get())
+        skip_contacted = skip_contacted_var.get()
+        resume = resume_var.get()
+        dedup = dedup_var.get()
         
         # Get delay time
         try:
@@ -1793,6 +3765,20 @@ def start_sending():
             
             if not email_subject:
                 email_subject = "Message from growHigh"
+            
+            try:
+                email_parallel = max(1, int(email_parallel_entry.get().strip()))
+            except ValueError:
+                email_parallel = EMAIL_MAX_IN_FLIGHT
+                log(f"⚠️ Invalid parallel emails value, using {EMAIL_MAX_IN_FLIGHT}")
+            
+            try:
+                email_rate = float(email_rate_entry.get().strip())
+                if email_rate <= 0:
+                    email_rate = EMAIL_RATE_PER_SECOND
+            except ValueError:
+                email_rate = EMAIL_RATE_PER_SECOND
+                log(f"⚠️ Invalid emails/sec value, using {EMAIL_RATE_PER_SECOND}")
         
         # Detect Android device if using SMS platform
         android_device = None
@@ -1805,218 +3791,112 @@ def start_sending():
                 return
             log("✅ Android device ready for SMS sending")
         
+        # Send journal: resume skips rows it already marked sent
         try:
-            df = pd.read_csv(csv_path)
+            journal = SendJournal(csv_path, platform, resume)
+        except OSError as e:
+            journal = None
+            log(f"⚠️ Send journal unavailable ({e}), this run can't be resumed")
+        if journal and journal.completed:
+            if journal.csv_changed:
+                log("⚠️ CSV changed since the journaled run, row numbers may have shifted")
+            resume_row = journal.first_pending_row(row_start)
+            log(f"♻️ Resuming: {len(journal.completed)} rows already sent, continuing from row {resume_row}")
+            row_start = resume_row
+        
+        # Extract contacts based on platform (large CSVs are streamed chunk by chunk)
+        prep_start = time.perf_counter()
+        try:
+            csv_size = os.path.getsize(csv_path)
+            contacts = iter_contacts(csv_path, platform, message, attachment_path, row_start, row_end, skip_01_numbers, log,
+                                     country_code=country_code)
+            if csv_size > CSV_STREAM_THRESHOLD_BYTES:
+                first = next(contacts, None)
+                total = None
+            else:
+                rows = list(contacts)
+                total = len(rows)
         except Exception as e:
             log(f"❌ CSV Error: {e}")
+            if journal:
+                journal.close()
             start_btn.config(state=tk.NORMAL)
             return
-
-        # Extract contacts based on platform
-        rows = []
         
-        if platform == "Email":
-            # Email mode: look for email column
-            email_col = None
-            name_col = None
-            
-            for c in df.columns:
-                if c.lower() in ('email', 'email_address', 'mail', 'recipient'):
-                    email_col = c
-                    break
-            
-            for c in df.columns:
-                if c.lower() in ('name', 'contact_name', 'fullname', 'full_name', 'customer_name'):
-                    name_col = c
-                    break
+        if total is None:
+            def stream_rows():
+                yield first
+                try:
+                    yield from contacts
+                except Exception as e:
+                    log(f"❌ CSV Error while streaming: {e}")
             
-            if email_col:
-                for idx, r in df.iterrows():
-                    # Skip rows outside the specified range
-                    row_number = idx + 1  # Convert 0-based index to 1-based row number
-                    if row_number < row_start or row_number > row_end:
-                        continue
-                    
-                    email_raw = str(r[email_col]).strip()
-                    
-                    if not re.match(r'^[^@]+@[^@]+\.[^@]+$', email_raw):
-                        log(f"⚠️ Skipping invalid email: {email_raw}")
-                        continue
-                    
-                    name = "Friend"
-                    if name_col and not pd.isna(r[name_col]):
-                        name = str(r[name_col]).strip()
-                    
-                    # Personalize message with name
-                    personalized_msg = message.replace("{{name}}", name).replace("{name}", name)
-                    personalized_msg = f"Hello {name},\n\n{personalized_msg}"
-                    rows.append((email_raw, personalized_msg, name))
-            else:
-                # Fallback: use first column as email
-                first_col = df.columns[0]
-                for idx, r in df.iterrows():
-                    # Skip rows outside the specified range
-                    row_number = idx + 1  # Convert 0-based index to 1-based row number
-                    if row_number < row_start or row_number > row_end:
-                        continue
-                    
-                    email_raw = str(r[first_col]).strip()
-                    
-                    if not re.match(r'^[^@]+@[^@]+\.[^@]+$', email_raw):
-                        log(f"⚠️ Skipping invalid email: {email_raw}")
-                        continue
-                    
-                    name = "Friend"
-                    if len(df.columns) > 1:
-                        second_col = df.columns[1]
-                        if not pd.isna(r[second_col]):
-                            name = str(r[second_col]).strip()
-                    
-                    personalized_msg = message.replace("{{name}}", name).replace("{name}", name)
-                    personalized_msg = f"Hello {name},\n\n{personalized_msg}"
-                    rows.append((email_raw, personalized_msg, name))
+            rows = stream_rows() if first is not None else []
+            log(f"⚡ First contact ready in {(time.perf_counter() - prep_start) * 1000:.0f} ms "
+                f"(streaming {csv_size / 1048576:.0f} MB CSV, {CSV_CHUNK_SIZE} rows per chunk)")
+        else:
+            log(f"⚡ Prepared {total} contacts in {(time.perf_counter() - prep_start) * 1000:.0f} ms")
         
-        elif platform == "Messenger":
-            # Messenger mode: look for username column
-            username_col = None
-            name_col = None
-            
-            for c in df.columns:
-                if c.lower() in ('username', 'user', 'facebook_username', 'fb_username', 'messenger_username'):
-                    username_col = c
-                    break
-            
-            for c in df.columns:
-                if c.lower() in ('name', 'contact_name', 'fullname', 'full_name', 'customer_name'):
-                    name_col = c
-                    break
-            
-            if username_col:
-                for idx, r in df.iterrows():
-                    # Skip rows outside the specified range
-                    row_number = idx + 1  # Convert 0-based index to 1-based row number
-                    if row_number < row_start or row_number > row_end:
-                        continue
-                    
-                    username_raw = str(r[username_col]).strip()
-                    
-                    if not username_raw or username_raw == 'nan':
-                        log(f"⚠️ Skipping empty username at row {row_number}")
-                        continue
-                    
-                    # Use username as name if no name column, otherwise use name column
-                    name = username_raw
-                    if name_col and not pd.isna(r[name_col]):
-                        name = str(r[name_col]).strip()
-                    
-                    # Personalize message: replace {{name}} with name, add "Hello {username}" prefix
-                    personalized_msg = message.replace("{{name}}", name).replace("{name}", name)
-                    personalized_msg = f"Hello {username_raw},\n\n{personalized_msg}"
-                    rows.append((username_raw, personalized_msg, username_raw))
-            else:
-                # Fallback: use first column as username
-                first_col = df.columns[0]
-                for idx, r in df.iterrows():
-                    # Skip rows outside the specified range
-                    row_number = idx + 1  # Convert 0-based index to 1-based row number
-                    if row_number < row_start or row_number > row_end:
-                        continue
-                    
-                    username_raw = str(r[first_col]).strip()
-                    
-                    if not username_raw or username_raw == 'nan':
-                        log(f"⚠️ Skipping empty username at row {row_number}")
-                        continue
-                    
-                    # Use username as name if no name column, otherwise use second column as name
-                    name = username_raw
-                    if len(df.columns) > 1:
-                        second_col = df.columns[1]
-                        if not pd.isna(r[second_col]):
-                            name = str(r[second_col]).strip()
-                    
-                    # Personalize message: replace {{name}} with name, add "Hello {username}" prefix
-                    personalized_msg = message.replace("{{name}}", name).replace("{name}", name)
-                    personalized_msg = f"Hello {username_raw},\n\n{personalized_msg}"
-                    rows.append((username_raw, personalized_msg, username_raw))
+        if journal and journal.completed:
+            if total is not None:
+                rows = list(journal.filter_pending(rows))
+                total = len(rows)
+            elif rows:
+                rows = journal.filter_pending(rows)
         
-        else:
-            # WhatsApp/SMS mode: look for phone column
-            phone_col = None
-            name_col = None
-            
-            for c in df.columns:
-                if c.lower() in ('phone','phone_number','phone_number_e164','number'):
-                    phone_col = c
-                    break
-            
-            for c in df.columns:
-                if c.lower() in ('name', 'contact_name', 'fullname', 'full_name', 'customer_name'):
-                    name_col = c
-                    break
-            
-            if phone_col:
-                for idx, r in df.iterrows():
-                    # Skip rows outside the specified range
-                    row_number = idx + 1  # Convert 0-based index to 1-based row number
-                    if row_number < row_start or row_number > row_end:
-                        continue
-                    
-                    phone_raw = str(r[phone_col]).strip()
-                    phone_clean = extract_phone_digits(phone_raw)
-                    
-                    # Skip numbers starting with 01
-                    if skip_01_numbers and phone_clean.startswith("01"):
-                        log(f"⏭️ Skipping number starting with 01: {phone_raw}")
-                        continue
-                    
-                    name = "Friend"
-                    if name_col and not pd.isna(r[name_col]):
-                        name = str(r[name_col]).strip()
-                    
-                    if phone_clean:
-                        # If attachment exists but no message, don't add greeting
-                        if attachment_path and (not message or not message.strip()):
-                            personalized_msg = ""  # Empty message, only attachment
-                        else:
-                            # Normal message with greeting
-                            personalized_msg = f"Hello {name},\n\n{message}"
-                        rows.append((phone_clean, personalized_msg, name))
-                    else:
-                        log(f"⚠️ Skipping invalid phone: {phone_raw}")
-            else:
-                # fallback: use first column as phone
-                first_col = df.columns[0]
-                for idx, r in df.iterrows():
-                    # Skip rows outside the specified range
-                    row_number = idx + 1  # Convert 0-based index to 1-based row number
-                    if row_number < row_start or row_number > row_end:
-                        continue
-                    
-                    phone_raw = str(r[first_col]).strip()
-                    phone_clean = extract_phone_digits(phone_raw)
-                    
-                    # Skip numbers starting with 01
-                    if skip_01_numbers and phone_clean.startswith("01"):
-                        log(f"⏭️ Skipping number starting with 01: {phone_raw}")
-                        continue
-                    
-                    name = "Sir/Ma'am"
-                    if len(df.columns) > 1:
-                        second_col = df.columns[1]
-                        if not pd.isna(r[second_col]):
-                            name = str(r[second_col]).strip()
-                    
-                    if phone_clean:
-                        # If attachment exists but no message, don't add greeting
-                        if attachment_path and (not message or not message.strip()):
-                            personalized_msg = ""  # Empty message, only attachment
-                        else:
-                            # Normal message with greeting
-                            personalized_msg = f"Hello {name},\n\n{message}"
-                        rows.append((phone_clean, personalized_msg, name))
-                    else:
-                        log(f"⚠️ Skipping invalid phone: {phone_raw}")
+        # Dedup on normalized keys before the suppression lookup, so repeats aren't looked up twice
+        deduper = RecipientDeduper(platform) if dedup else None
+        if deduper:
+            if total is not None:
+                dedup_start = time.perf_counter()
+                rows = list(deduper.filter(rows))
+                total = len(rows)
+                log(f"🧹 Removed {deduper.removed} duplicate recipients in {(time.perf_counter() - dedup_start) * 1000:.0f} ms")
+            elif rows:
+                rows = deduper.filter(rows)
+        
+        # Suppression index: every successful send is recorded; skipping is optional
+        try:
+            suppression = SuppressionIndex()
+        except sqlite3.Error as e:
+            suppression = None
+            log(f"⚠️ Suppression list unavailable ({e}), already-messaged contacts won't be skipped")
+        
+        if suppression and skip_contacted:
+            lookup_start = time.perf_counter()
+            history = suppression.count(platform)
+            if total is not None:
+                rows = list(suppression.filter_new(platform, rows))
+                total = len(rows)
+                log(f"⏭️ Skipped {suppression.skipped} already-messaged contacts "
+                    f"({history} in {platform} history, checked in {(time.perf_counter() - lookup_start) * 1000:.0f} ms)")
+            elif rows:
+                rows = suppression.filter_new(platform, rows)
+                log(f"⏭️ Skipping already-messaged contacts as they stream ({history} in {platform} history)")
+        
+        def record_result(row_data, ok, status=None):
+            if journal:
+                try:
+                    journal.record(row_data, ok, status)
+                except OSError as e:
+                    log(f"  ⚠️ Could not write send journal: {e}")
+            if ok and suppression:
+                try:
+                    suppression.add(platform, row_data.target)
+                except sqlite3.Error as e:
+                    log(f"  ⚠️ Could not record {row_data.target} in suppression list: {e}")
+        
+        def close_journals():
+            if suppression:
+                suppression.close()
+            if journal:
+                journal.close()
+        
+        def progress(i):
+            return f"{i}/{total}" if total is not None else str(i)
+        
+        def pending(done):
+            return str(total - done) if total is not None else "…"
 
         if not rows:
             if platform == "Email":
@@ -2025,74 +3905,145 @@ def start_sending():
                 contact_type = "usernames"
             else:
                 contact_type = "phone numbers"
-            log(f"❌ No valid {contact_type} found.")
+            if suppression and suppression.skipped:
+                log(f"✅ All {contact_type} in range were already messaged, nothing to send.")
+            else:
+                log(f"❌ No valid {contact_type} found.")
+            close_journals()
             start_btn.config(state=tk.NORMAL)
             return
 
-        log(f"🚀 Starting broadcast to {len(rows)} contacts via {platform}...")
+        if total is not None:
+            log(f"🚀 Starting broadcast to {total} contacts via {platform}...")
+        else:
+            log(f"🚀 Starting streamed broadcast via {platform}...")
         log(f"📂 CSV File: {csv_path}")
         log(f"📊 Row Range: {row_start} to {row_end}")
         if platform == "WhatsApp":
             log(f"⏱️ Delay between messages: {delay_seconds} seconds")
             if skip_01_numbers:
                 log(f"⏭️ Skipping numbers starting with 01: ENABLED")
+        if country_code and platform in ("WhatsApp", "SMS"):
+            log(f"🌐 Default country code: +{country_code}")
         if attachment_path:
             log(f"📎 Attachment: {os.path.basename(attachment_path)}")
 
-        # Create driver for WhatsApp or Messenger
+        # Driver for WhatsApp or Messenger: the pre-launched one if ready (launch started above), else a new one
         if platform in ["WhatsApp", "Messenger"]:
             try:
-                driver = create_driver()
+                driver = browser_prewarmer.take() or create_driver()
+                home = PLATFORM_HOME_URLS[platform]
+                if not driver.current_url.startswith(home):
+                    driver.get(home)
             except Exception as e:
                 log(f"❌ Driver error: {e}")
+                close_journals()
                 start_btn.config(state=tk.NORMAL)
                 return
 
-            if platform == "WhatsApp":
-                # Open WhatsApp Web
-                driver.get("https://web.whatsapp.com")
-                time.sleep(2)
-                if "web.whatsapp.com" in driver.current_url and "qr" in driver.page_source.lower():
-                    log("📱 Please scan QR code in WhatsApp Web. Waiting 20s...")
-                    time.sleep(20)
-            elif platform == "Messenger":
-                # Open Messenger
-                driver.get("https://www.messenger.com")
-                time.sleep(2)
-                if "login" in driver.current_url.lower():
-                    log("📱 Please log in to Facebook Messenger. Waiting 20s...")
-                    time.sleep(20)
+            # Poll for the logged-in app instead of a fixed wait
+            login_start = time.perf_counter()
+            if not wait_for_login(driver, platform, log, stop_event):
+                log("⏹ Stopped by user." if stop_event.is_set() else f"❌ Not logged in to {platform} after {LOGIN_TIMEOUT}s")
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                close_journals()
+                start_btn.config(state=tk.NORMAL)
+                return
+            log(f"🔓 {platform} ready in {time.perf_counter() - login_start:.1f}s")
 
         sent_count = 0
         failed_list = []
+        unavailable_count = 0
+        strategies = StrategyCache()  # Which selector/method worked, shared across this run
+        network = NetworkStats()
+        if platform in ["WhatsApp", "Messenger"]:
+            blocked = getattr(driver, "blocked_url_patterns", [])
+            log(f"🚫 Blocking {len(blocked)} heavy resource patterns" if blocked else "🌐 Resource blocking off")
+            network.sample(driver, count=False)  # Start counting from the first contact, not the app load
         
         # Sending loop based on platform
         if platform == "Email":
-            # Email sending loop
-            for i, row_data in enumerate(rows, start=1):
-                if stop_event.is_set():
-                    log("⏹ Stopped by user.")
-                    break
+            # Email sending loop (one pooled SMTP session reused across recipients)
+            smtp_pool = SMTPSessionPool(sender_email, sender_password)
+            attachment_cache = AttachmentCache()
+            if email_parallel > 1:
+                # Concurrent mode: bounded in-flight sends, paced by the sender's token bucket
+                log(f"⚡ Concurrent email mode: {email_parallel} in flight, max {email_rate:g} emails/sec")
+                rate_limiter = get_sender_rate_limiter(sender_email, email_rate)
+                stats_lock = threading.Lock()
+                done = {'count': 0}
                 
-                target_email, msg, name = row_data
-                log(f"[{i}/{len(rows)}] → {target_email} ({name})")
-                stats_pending.config(text=str(len(rows) - i))
+                def update_email_stats(sent, failed, pending_text):
+                    def _update():
+                        stats_sent.config(text=str(sent))
+                        stats_failed.config(text=str(failed))
+                        stats_pending.config(text=pending_text)
+                    root.after(0, _update)
                 
-                try:
-                    ok = send_email_smtp(target_email, email_subject, msg, sender_email, sender_password, log, stop_event, attachment_path)
-                    if ok:
-                        sent_count += 1
-                        stats_sent.config(text=str(sent_count))
-                    else:
-                        failed_list.append(target_email)
-                        stats_failed.config(text=str(len(failed_list)))
-                except Exception as e:
-                    log(f"  ❌ ERROR {target_email}: {e}")
-                    failed_list.append(target_email)
-                    stats_failed.config(text=str(len(failed_list)))
+                def send_one(i, row_data):
+                    nonlocal sent_count
+                    target_email, name = row_data.target, row_data.name
+                    msg = row_data.render()  # Personalized just before sending
+                    if not rate_limiter.acquire(stop_event):
+                        return
+                    log(f"[{progress(i)}] → {target_email} ({name})")
+                    try:
+                        ok = send_email_smtp(target_email, email_subject, msg, sender_email, sender_password, log, stop_event, attachment_path, smtp_pool, delay_seconds=0, attachment_cache=attachment_cache)
+                    except Exception as e:
+                        log(f"  ❌ ERROR {target_email}: {e}")
+                        ok = False
+                    record_result(row_data, ok)
+                    with stats_lock:
+                        done['count'] += 1
+                        if ok:
+                            sent_count += 1
+                        else:
+                            failed_list.append(target_email)
+                        update_email_stats(sent_count, len(failed_list), pending(done['count']))
                 
+                run_bounded_concurrently(enumerate(rows, start=1), send_one, email_parallel, stop_event)
                 if stop_event.is_set():
-                    break
+                    log("⏹ Stopped by user.")
+            
+            else:
+                for i, row_data in enumerate(rows, start=1):
+                    if stop_event.is_set():
+                        log("⏹ Stopped by user.")
+                        break
+                    
+                    target_email, name = row_data.target, row_data.name
+                    msg = row_data.render()  # Personalized just before sending
+                    log(f"[{progress(i)}] → {target_email} ({name})")
+                    stats_pending.config(text=pending(i))
+                    
+                    try:
+                        ok = send_email_smtp(target_email, email_subject, msg, sender_email, sender_password, log, stop_event, attachment_path, smtp_pool, attachment_cache=attachment_cache)
+                        if ok:
+                            sent_count += 1
+                            record_result(row_data, True)
+                            stats_sent.config(text=str(sent_count))
+                        else:
+                            failed_list.append(target_email)
+                            record_result(row_data, False)
+                            stats_failed.config(text=str(len(failed_list)))
+                    except Exception as e:
+                        log(f"  ❌ ERROR {target_email}: {e}")
+                        failed_list.append(target_email)
+                        record_result(row_data, False)
+                        stats_failed.config(text=str(len(failed_list)))
+                    
+                    if stop_event.is_set():
+                        break
+            
+            smtp_pool.close()
+            if smtp_pool.messages_sent:
+                log(f"📈 SMTP: {smtp_pool.messages_sent} emails over {smtp_pool.connections_opened} connection(s), "
+                    f"{smtp_pool.reconnects} reconnect(s), avg {smtp_pool.average_latency_ms():.0f} ms/email")
+            if attachment_path:
+                log(attachment_cache.summary())
         
         elif platform == "SMS":
             # SMS sending loop
@@ -2101,21 +4052,25 @@ def start_sending():
                     log("⏹ Stopped by user.")
                     break
                 
-                target_phone, msg, name = row_data
-                log(f"[{i}/{len(rows)}] → {target_phone} ({name})")
-                stats_pending.config(text=str(len(rows) - i))
+                target_phone, name = row_data.target, row_data.name
+                msg = row_data.render()  # Personalized just before sending
+                log(f"[{progress(i)}] → {target_phone} ({name})")
+                stats_pending.config(text=pending(i))
                 
                 try:
                     ok = send_message_sms(android_device, target_phone, msg, log, stop_event, delay_seconds)
                     if ok:
                         sent_count += 1
+                        record_result(row_data, True)
                         stats_sent.config(text=str(sent_count))
                     else:
                         failed_list.append(target_phone)
+                        record_result(row_data, False)
                         stats_failed.config(text=str(len(failed_list)))
                 except Exception as e:
                     log(f"  ❌ ERROR {target_phone}: {e}")
                     failed_list.append(target_phone)
+                    record_result(row_data, False)
                     stats_failed.config(text=str(len(failed_list)))
                 
                 if stop_event.is_set():
@@ -2123,26 +4078,38 @@ def start_sending():
         
         elif platform == "Messenger":
             # Messenger sending loop
+            messenger_phases = PhaseStats()
             for i, row_data in enumerate(rows, start=1):
                 if stop_event.is_set():
                     log("⏹ Stopped by user.")
                     break
                 
-                target_username, msg, name = row_data
-                log(f"[{i}/{len(rows)}] → {target_username} ({name})")
-                stats_pending.config(text=str(len(rows) - i))
+                target_username, name = row_data.target, row_data.name
+                msg = row_data.render()  # Personalized just before sending
+                log(f"[{progress(i)}] → {target_username} ({name})")
+                stats_pending.config(text=pending(i))
                 
                 try:
-                    ok = send_message_messenger(driver, target_username, msg, log, stop_event, attachment_path)
+                    ok = send_message_messenger(driver, target_username, msg, log, stop_event, attachment_path, strategies, messenger_phases)
+                    network.sample(driver)
                     if ok:
                         sent_count += 1
+                        record_result(row_data, True)
                         stats_sent.config(text=str(sent_count))
                     else:
                         failed_list.append(target_username)
+                        record_result(row_data, False)
                         stats_failed.config(text=str(len(failed_list)))
+                except RecipientUnavailableError as e:
+                    log(f"  🚫 {target_username}: {e.reason}")
+                    unavailable_count += 1
+                    failed_list.append(target_username)
+                    record_result(row_data, False, "unavailable")
+                    stats_failed.config(text=str(len(failed_list)))
                 except Exception as e:
                     log(f"  ❌ ERROR {target_username}: {e}")
                     failed_list.append(target_username)
+                    record_result(row_data, False)
                     stats_failed.config(text=str(len(failed_list)))
                 
                 # Short delay between messages
@@ -2156,39 +4123,75 @@ def start_sending():
                 
                 if stop_event.is_set():
                     break
+            
+            phase_summary = messenger_phases.summary()
+            if phase_summary:
+                log(f"⏱️ Wait phases: {phase_summary}")
         
         else:
             # WhatsApp sending loop
+            whatsapp_phases = PhaseStats()
             for i, row_data in enumerate(rows, start=1):
                 if stop_event.is_set():
                     log("⏹ Stopped by user.")
                     break
                 
-                target_phone, msg, name = row_data
-                log(f"[{i}/{len(rows)}] → {target_phone} ({name})")
-                stats_pending.config(text=str(len(rows) - i))
+                target_phone, name = row_data.target, row_data.name
+                msg = row_data.render()  # Personalized just before sending
+                log(f"[{progress(i)}] → {target_phone} ({name})")
+                stats_pending.config(text=pending(i))
                 
                 try:
-                    ok = send_message_whatsapp(driver, target_phone, msg, log, stop_event, attachment_path, delay_seconds)
+                    ok = send_message_whatsapp(driver, target_phone, msg, log, stop_event, attachment_path, delay_seconds, whatsapp_phases, strategies)
+                    network.sample(driver)
                     if ok:
                         sent_count += 1
+                        record_result(row_data, True)
                         stats_sent.config(text=str(sent_count))
                     else:
                         failed_list.append(target_phone)
+                        record_result(row_data, False)
                         stats_failed.config(text=str(len(failed_list)))
+                except RecipientUnavailableError as e:
+                    log(f"  🚫 {target_phone}: {e.reason}")
+                    unavailable_count += 1
+                    failed_list.append(target_phone)
+                    record_result(row_data, False, "unavailable")
+                    stats_failed.config(text=str(len(failed_list)))
                 except Exception as e:
                     log(f"  ❌ ERROR {target_phone}: {e}")
                     failed_list.append(target_phone)
+                    record_result(row_data, False)
                     stats_failed.config(text=str(len(failed_list)))
                 
                 # Delay is now handled inside send_message_whatsapp function with countdown
                 
                 if stop_event.is_set():
                     break
+            
+            phase_summary = whatsapp_phases.summary()
+            if phase_summary:
+                log(f"⏱️ Wait phases: {phase_summary}")
 
-        log(f"✅ COMPLETE: {sent_count}/{len(rows)} sent | ❌ Failed: {len(failed_list)}")
+        attempted = total if total is not None else sent_count + len(failed_list)
+        log(f"✅ COMPLETE: {sent_count}/{attempted} sent | ❌ Failed: {len(failed_list)}")
         if failed_list:
             log("📌 Failed contacts: " + ", ".join(failed_list[:5]))
+        if unavailable_count:
+            log(f"🚫 {unavailable_count} of the failed contacts can't be messaged on {platform}")
+        if deduper and total is None and deduper.removed:
+            log(f"🧹 Removed {deduper.removed} duplicate recipients")
+        if suppression and total is None and suppression.skipped:
+            log(f"⏭️ Skipped {suppression.skipped} already-messaged contacts")
+        if journal:
+            log(f"📒 Journal: {journal.sent} sent, {journal.failed} failed recorded in {journal.path}")
+        strategy_summary = strategies.summary()
+        if strategy_summary:
+            log(f"🎯 Selector cache: {strategy_summary}")
+        network_summary = network.summary()
+        if network_summary:
+            log(f"📶 Network: {network_summary}")
+        close_journals()
         
         if platform in ["WhatsApp", "Messenger"]:
             try:
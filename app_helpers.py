@@ -0,0 +1,21 @@
+"""
+Load the helpers from app.py without starting the UI, for the check scripts.
+
+app.py builds its Tk window at import time, so only the code above
+UI_MARKER is run. Keep that comment line in app.py where it is.
+"""
+
+import os
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+UI_MARKER = "# --- Global UI Components Storage ---"
+
+def load_app_helpers():
+    """Run app.py up to UI_MARKER and return its globals as a dict."""
+    with open(APP_PATH, encoding="utf-8") as f:
+        source = f.read()
+    if UI_MARKER not in source:
+        raise RuntimeError(f"'{UI_MARKER}' not found in {APP_PATH}; can't tell where the UI code starts")
+    helpers = {}
+    exec(compile(source.split(UI_MARKER)[0], APP_PATH, "exec"), helpers)
+    return helpers
@@ -0,0 +1,74 @@
+"""
+Check that StreamedMessage produces the same message as the email package.
+Run: python test_email_streaming.py
+
+The SMTP wire bytes, with CRLF turned back into LF and dot-stuffing undone,
+must equal msg.as_bytes() (attachment marker swapped for the encoded file)
+and parse back to the original body and attachment.
+"""
+
+import os
+import tempfile
+from email import message_from_bytes
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from app_helpers import load_app_helpers
+
+app = load_app_helpers()
+
+BODIES = [
+    "Hello\nFrom the team",
+    "Line one\n.starts with a dot\n..two dots\n.\nend",
+    "Hello Ram,\n\nNamaste 🙏 from Kathmandu\nFrom: us",
+]
+
+def build_message(body, boundary="BOUNDARY"):
+    msg = MIMEMultipart()
+    msg["From"] = "sender@example.com"
+    msg["To"] = "someone@example.com"
+    msg["Subject"] = "Test"
+    msg.attach(MIMEText(body, "plain"))
+    msg.set_boundary(boundary)
+    return msg
+
+def wire_to_bytes(streamed):
+    data = b"".join(bytes(chunk) for chunk in streamed.iter_chunks())
+    data = data.replace(b"\r\n", b"\n")
+    return b"\n".join(line[1:] if line.startswith(b".") else line for line in data.split(b"\n"))
+
+def test_body_only():
+    for body in BODIES:
+        msg = build_message(body)
+        expected = msg.as_bytes()
+        streamed = app["StreamedMessage"](msg)
+        assert wire_to_bytes(streamed).rstrip(b"\n") == expected.rstrip(b"\n"), body
+
+def test_with_attachment():
+    with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as f:
+        raw = os.urandom(100_000) + b".\nFrom x"
+        f.write(raw)
+        path = f.name
+    try:
+        attachment = app["EncodedAttachment"](path)
+        encoded = attachment.data.replace(b"\r\n", b"\n")
+        for body in BODIES:
+            msg = build_message(body)
+            msg.attach(attachment.placeholder_part())
+            got = wire_to_bytes(app["StreamedMessage"](msg, attachment))
+            expected = msg.as_bytes().replace(app["_ATTACHMENT_PLACEHOLDER"].encode("ascii"), encoded)
+            assert got.rstrip(b"\n") == expected.rstrip(b"\n"), body
+
+            # And a mail client reads back the same body text and file bytes
+            parsed = message_from_bytes(got)
+            text_part, file_part = parsed.get_payload()
+            assert text_part.get_payload(decode=True).decode("utf-8") == body, body
+            assert file_part.get_payload(decode=True) == raw
+            assert file_part.get_filename() == attachment.filename
+    finally:
+        os.remove(path)
+
+if __name__ == "__main__":
+    test_body_only()
+    test_with_attachment()
+    print("✅ Streamed email bytes match msg.as_bytes()")
@@ -0,0 +1,47 @@
+"""
+Check and time Messenger's unavailable-chat classifier against saved page text.
+Run: python test_messenger_unavailable.py
+
+Fixtures in fixtures/messenger_pages/ are the [role="main"] text the
+continue-prompt probe hands to messenger_unavailable_reason().
+"""
+
+import os
+import time
+
+from app_helpers import load_app_helpers
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(HERE, "fixtures", "messenger_pages")
+
+app = load_app_helpers()
+
+EXPECTED = {
+    "unavailable.txt": "content isn't available",
+    "blocked.txt": "can't message this account",
+    "normal_chat.txt": None,
+    "loading.txt": None,
+}
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+def test_classification():
+    for name, reason in EXPECTED.items():
+        got = app["messenger_unavailable_reason"](load_fixture(name))
+        assert got == reason, f"{name}: expected {reason!r}, got {got!r}"
+
+def benchmark(rounds=20000):
+    for name in EXPECTED:
+        text = load_fixture(name)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            app["messenger_unavailable_reason"](text)
+        per_call = (time.perf_counter() - start) / rounds * 1e6
+        print(f"  {name:<18} {per_call:6.1f} µs per page")
+
+if __name__ == "__main__":
+    test_classification()
+    print("✅ Messenger page classification matches the fixtures")
+    benchmark()